@@ -9,24 +9,27 @@ import os
 # Add src to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QEventLoop, QThreadPool
 
-from src.core.config import get_config
+from src.core.config import get_config, ConfigError
 from src.core.crypto import (
-    encrypt_master_key, decrypt_master_key, compute_key_hash, verify_key_hash,
-    CryptoError
+    decrypt_master_key_with_key, verify_key_hash, CryptoError, KeyDerivationError
 )
+from src.core.i18n import _
 from src.database.database import get_database, close_database
 from src.repository.repository import get_active_repository
 from src.ui.styles import get_stylesheet
-from src.ui.window_utils import patch_qt_dialogs
-from src.ui.setup.pin_setup import PinSetupDialog, PinVerifyDialog
-from src.ui.setup.key_setup import KeySetupDialog
-from src.ui.setup.repo_manager import RepositoryManagerDialog
-from src.ui.main.main_window import MainWindow
+from src.ui.window_utils import patch_qt_dialogs, watch_window
+from src.ui.setup.pin_setup import (
+    PinSetupDialog, PinVerifyDialog, KeyDerivationTask, MasterKeyWrapTask
+)
 from src.utils.logger import get_logger
 
+# KeySetupDialog, RepositoryManagerDialog and MainWindow are imported where
+# they are first needed so a returning user reaches the PIN dialog sooner.
+
 
 class SecureVaultApp:
     """Main application controller."""
@@ -43,7 +46,7 @@ class SecureVaultApp:
         
         self.config = get_config()
         self.master_key: bytes = None
-        self.main_window: MainWindow = None
+        self.main_window: "MainWindow" = None
         
         # Apply initial theme
         self.app.setStyleSheet(get_stylesheet(self.config.dark_mode))
@@ -82,6 +85,7 @@ class SecureVaultApp:
                 return 1
             
             # Show main window
+            from src.ui.main.main_window import MainWindow
             self.main_window = MainWindow(self.master_key, repo)
             self.main_window.show()
             
@@ -118,6 +122,7 @@ class SecureVaultApp:
             return False
         
         # Step 2: Key generation
+        from src.ui.setup.key_setup import KeySetupDialog
         key_dialog = KeySetupDialog()
         master_key: bytes = None
         
@@ -133,33 +138,76 @@ class SecureVaultApp:
         if not master_key:
             return False
         
-        # Encrypt and save master key
-        encrypted_key, salt, nonce = encrypt_master_key(master_key, pin)
-        key_hash = compute_key_hash(master_key)
+        # Encrypt master key with Argon2id tuned to this machine; the KDF
+        # runs on the thread pool while a busy dialog keeps the app painting
+        result = self._run_busy(
+            MasterKeyWrapTask(master_key, pin), _("msg_securing_key")
+        )
+        if isinstance(result, Exception):
+            raise result
+        opslimit, memlimit, encrypted_key, salt, nonce, key_hash = result
         
-        self.config.encrypted_master_key = encrypted_key
-        self.config.master_key_salt = salt
-        self.config.master_key_nonce = nonce
-        self.config.master_key_hash = key_hash
+        with self.config.batch():
+            self.config.kdf_opslimit = opslimit
+            self.config.kdf_memlimit = memlimit
+            self.config.encrypted_master_key = encrypted_key
+            self.config.master_key_salt = salt
+            self.config.master_key_nonce = nonce
+            self.config.master_key_hash = key_hash
         
         self.master_key = master_key
         self.logger.info("PIN 和密钥已配置")
         
         return True
     
+    def _run_busy(self, task, message: str):
+        """
+        Run a task on the thread pool behind a modal busy dialog.
+        
+        Args:
+            task: QRunnable whose signals.finished carries the result
+            message: Text shown while the task runs
+        
+        Returns:
+            The object emitted by task.signals.finished
+        """
+        progress = QProgressDialog(message, None, 0, 0)
+        watch_window(progress)
+        progress.setWindowTitle(self.app.applicationName())
+        progress.setWindowModality(Qt.WindowModality.ApplicationModal)
+        progress.setMinimumDuration(0)
+        
+        loop = QEventLoop()
+        result = None
+        
+        def on_finished(value):
+            nonlocal result
+            result = value
+            loop.quit()
+        
+        task.setAutoDelete(False)  # Kept alive by this frame until finished
+        task.signals.finished.connect(on_finished)
+        progress.show()
+        QThreadPool.globalInstance().start(task)
+        loop.exec()
+        progress.close()
+        return result
+    
     def _verify_pin(self) -> bool:
         """Verify PIN and decrypt master key."""
         pin_dialog = PinVerifyDialog()
         verified = False
+        task: KeyDerivationTask = None  # Keeps the in-flight runnable alive
         
-        def on_pin_verified(pin: str):
+        def on_key_derived(result):
             nonlocal verified
             try:
-                # Attempt to decrypt master key
-                decrypted_key = decrypt_master_key(
+                if isinstance(result, Exception):
+                    raise result
+                derived_key = result
+                decrypted_key = decrypt_master_key_with_key(
                     self.config.encrypted_master_key,
-                    pin,
-                    self.config.master_key_salt,
+                    derived_key,
                     self.config.master_key_nonce
                 )
                 
@@ -172,10 +220,37 @@ class SecureVaultApp:
                 else:
                     pin_dialog.show_error("PIN 码错误")
                     self.logger.warning("PIN 验证失败 - 哈希不匹配")
+            except ConfigError as e:
+                pin_dialog.show_error("配置文件已损坏，无法解锁")
+                self.logger.error(f"PIN 验证失败 - {e}")
+            except KeyDerivationError:
+                pin_dialog.show_error("密钥派生失败，配置可能已损坏")
+                self.logger.error("PIN 验证失败 - 密钥派生错误")
             except CryptoError:
                 pin_dialog.show_error("PIN 码错误")
                 self.logger.warning("PIN 验证失败 - 解密错误")
         
+        def on_pin_verified(pin: str):
+            nonlocal task
+            # Argon2id runs once per attempt on the thread pool so the dialog
+            # keeps repainting; the dialog is locked until the result arrives
+            try:
+                salt = self.config.master_key_salt
+            except ConfigError as e:
+                pin_dialog.show_error("配置文件已损坏，无法解锁")
+                self.logger.error(f"PIN 验证失败 - {e}")
+                return
+            pin_dialog.set_busy(True)
+            task = KeyDerivationTask(
+                pin,
+                salt,
+                self.config.kdf_opslimit,
+                self.config.kdf_memlimit
+            )
+            task.setAutoDelete(False)
+            task.signals.finished.connect(on_key_derived)
+            QThreadPool.globalInstance().start(task)
+        
         pin_dialog.pin_verified.connect(on_pin_verified)
         
         if pin_dialog.exec() != PinVerifyDialog.DialogCode.Accepted:
@@ -191,6 +266,7 @@ class SecureVaultApp:
             return True
         
         # Show repository manager
+        from src.ui.setup.repo_manager import RepositoryManagerDialog
         repo_dialog = RepositoryManagerDialog(self.master_key)
         selected = False
         
@@ -3,20 +3,35 @@ Secure Vault - Configuration Management
 Handles global configuration, paths, and settings.
 """
 
+import base64
+import binascii
 import json
 import os
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Any
 
 
+class ConfigError(Exception):
+    """Exception raised when a stored configuration value is corrupted."""
+    pass
+
+
 class Config:
     """Global configuration manager for Secure Vault."""
     
     # Application paths
     APP_NAME = "SecureVault"
     
+    # Binary values stored as base64 text (hex before key_encoding was added)
+    BINARY_KEYS = ("encrypted_master_key", "master_key_salt", "master_key_nonce")
+    BINARY_ENCODING = "base64"
+    
     def __init__(self):
         self._config_data: dict = {}
+        self._bin_cache: dict[str, bytes] = {}  # Decoded binary values by key
+        self._batch_depth = 0
+        self._save_pending = False
         self._config_dir = self._get_config_dir()
         self._config_file = self._config_dir / "config.json"
         self._ensure_directories()
@@ -44,11 +59,83 @@ class Config:
                 self._config_data = {}
         else:
             self._config_data = {}
+        self._migrate_binary_encoding()
+    
+    def _migrate_binary_encoding(self) -> None:
+        """Convert legacy hex-encoded binary values to base64 (one-time)."""
+        if self._config_data.get("key_encoding") == self.BINARY_ENCODING:
+            return
+        present = [k for k in self.BINARY_KEYS if self._config_data.get(k)]
+        if not present:
+            return
+        try:
+            for key in present:
+                raw = bytes.fromhex(self._config_data[key])
+                self._config_data[key] = base64.b64encode(raw).decode("ascii")
+        except (TypeError, ValueError):
+            # Leave unreadable data untouched; decryption will report it
+            return
+        self._config_data["key_encoding"] = self.BINARY_ENCODING
+        self._save_config()
+    
+    def _get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a base64-stored binary value, decoding it only once."""
+        cached = self._bin_cache.get(key)
+        if cached is not None:
+            return cached
+        encoded = self._config_data.get(key)
+        if not encoded:
+            return None
+        if self._config_data.get("key_encoding") == self.BINARY_ENCODING:
+            try:
+                value = base64.b64decode(encoded, validate=True)
+            except (binascii.Error, TypeError) as e:
+                raise ConfigError(f"配置项 {key} 已损坏，无法解码") from e
+        else:
+            try:
+                value = bytes.fromhex(encoded)
+            except (ValueError, TypeError) as e:
+                raise ConfigError(f"配置项 {key} 已损坏，无法解码") from e
+        self._bin_cache[key] = value
+        return value
+    
+    def _set_bytes(self, key: str, value: bytes) -> None:
+        """Store a binary value as base64 and invalidate its cached form."""
+        self._config_data[key] = base64.b64encode(value).decode("ascii")
+        self._config_data["key_encoding"] = self.BINARY_ENCODING
+        self._bin_cache.pop(key, None)
+        self._save_config()
     
     def _save_config(self) -> None:
-        """Save configuration to file."""
-        with open(self._config_file, "w", encoding="utf-8") as f:
-            json.dump(self._config_data, f, indent=2, ensure_ascii=False)
+        """Save configuration to file (deferred while inside batch())."""
+        if self._batch_depth:
+            self._save_pending = True
+            return
+        
+        # Write to a temp file and swap it in so a crash never leaves a torn config
+        data = json.dumps(self._config_data, indent=2, ensure_ascii=False)
+        tmp_file = self._config_file.with_name(self._config_file.name + ".tmp")
+        tmp_file.write_bytes(data.encode("utf-8"))
+        os.replace(tmp_file, self._config_file)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group several setters into a single config write.
+        
+        The file is written once when the outermost batch exits normally;
+        on error nothing is flushed.
+        """
+        self._batch_depth += 1
+        completed = False
+        try:
+            yield self
+            completed = True
+        finally:
+            self._batch_depth -= 1
+            if completed and self._batch_depth == 0 and self._save_pending:
+                self._save_pending = False
+                self._save_config()
     
     @property
     def config_dir(self) -> Path:
@@ -83,26 +170,22 @@ class Config:
     @property
     def encrypted_master_key(self) -> Optional[bytes]:
         """Get the encrypted master key."""
-        key_hex = self._config_data.get("encrypted_master_key")
-        return bytes.fromhex(key_hex) if key_hex else None
+        return self._get_bytes("encrypted_master_key")
     
     @encrypted_master_key.setter
     def encrypted_master_key(self, value: bytes) -> None:
         """Set the encrypted master key."""
-        self._config_data["encrypted_master_key"] = value.hex()
-        self._save_config()
+        self._set_bytes("encrypted_master_key", value)
     
     @property
     def master_key_salt(self) -> Optional[bytes]:
         """Get the salt used for PIN derivation."""
-        salt_hex = self._config_data.get("master_key_salt")
-        return bytes.fromhex(salt_hex) if salt_hex else None
+        return self._get_bytes("master_key_salt")
     
     @master_key_salt.setter
     def master_key_salt(self, value: bytes) -> None:
         """Set the salt for PIN derivation."""
-        self._config_data["master_key_salt"] = value.hex()
-        self._save_config()
+        self._set_bytes("master_key_salt", value)
     
     @property
     def language(self) -> str:
@@ -119,14 +202,12 @@ class Config:
     @property
     def master_key_nonce(self) -> Optional[bytes]:
         """Get the nonce used for master key encryption."""
-        nonce_hex = self._config_data.get("master_key_nonce")
-        return bytes.fromhex(nonce_hex) if nonce_hex else None
+        return self._get_bytes("master_key_nonce")
     
     @master_key_nonce.setter
     def master_key_nonce(self, value: bytes) -> None:
         """Set the nonce for master key encryption."""
-        self._config_data["master_key_nonce"] = value.hex()
-        self._save_config()
+        self._set_bytes("master_key_nonce", value)
     
     @property
     def master_key_hash(self) -> Optional[str]:
@@ -139,6 +220,29 @@ class Config:
         self._config_data["master_key_hash"] = value
         self._save_config()
     
+    # Argon2id cost parameters (None means the MODERATE defaults)
+    @property
+    def kdf_opslimit(self) -> Optional[int]:
+        """Get the Argon2id ops limit used for the master key."""
+        return self._config_data.get("kdf_opslimit")
+    
+    @kdf_opslimit.setter
+    def kdf_opslimit(self, value: Optional[int]) -> None:
+        """Set the Argon2id ops limit used for the master key."""
+        self._config_data["kdf_opslimit"] = value
+        self._save_config()
+    
+    @property
+    def kdf_memlimit(self) -> Optional[int]:
+        """Get the Argon2id memory limit used for the master key."""
+        return self._config_data.get("kdf_memlimit")
+    
+    @kdf_memlimit.setter
+    def kdf_memlimit(self, value: Optional[int]) -> None:
+        """Set the Argon2id memory limit used for the master key."""
+        self._config_data["kdf_memlimit"] = value
+        self._save_config()
+    
     # Active repository
     @property
     def active_repository_id(self) -> Optional[int]:
@@ -158,6 +262,7 @@ class Config:
     def set(self, key: str, value: Any) -> None:
         """Set a configuration value."""
         self._config_data[key] = value
+        self._bin_cache.pop(key, None)
         self._save_config()
 
 
@@ -3,21 +3,33 @@ Secure Vault - Cryptographic Operations
 Implements all encryption, decryption, and key management using libsodium (PyNaCl).
 """
 
-import secrets
-from typing import Tuple
+import hmac
+import os
+import time
+from typing import Optional, Tuple
 
 from nacl.pwhash import argon2id
-from nacl.secret import SecretBox
+from nacl.bindings import (
+    crypto_secretbox, crypto_secretbox_open,
+    crypto_aead_chacha20poly1305_ietf_encrypt,
+    crypto_aead_chacha20poly1305_ietf_decrypt
+)
 from nacl.utils import random as nacl_random
 from nacl.hash import blake2b
 from nacl.encoding import RawEncoder
+from nacl.exceptions import CryptoError as NaclCryptoError
 
 
 # Constants
 MASTER_KEY_SIZE = 32  # 256 bits
 SALT_SIZE = 16  # 128 bits for Argon2id
 NONCE_SIZE = 24  # 192 bits for XSalsa20-Poly1305
+BLOCK_NONCE_SIZE = 12  # 96 bits for ChaCha20-Poly1305-IETF (new data blocks)
 BLOCK_SIZE = 4 * 1024 * 1024  # 4 MB blocks (optimized for large files)
+KDF_TARGET_SECONDS = 0.25  # Wall time calibrate_kdf_params aims for
+
+# Use URL-safe characters for compatibility
+PASSWORD_ALPHABET = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
 
 
 class CryptoError(Exception):
@@ -25,6 +37,11 @@ class CryptoError(Exception):
     pass
 
 
+class KeyDerivationError(CryptoError):
+    """Exception raised when PIN key derivation itself fails (not a wrong PIN)."""
+    pass
+
+
 def generate_master_key() -> bytes:
     """
     Generate a new random master key.
@@ -45,56 +62,114 @@ def generate_salt() -> bytes:
     return nacl_random(SALT_SIZE)
 
 
-def derive_key_from_pin(pin: str, salt: bytes) -> bytes:
+def derive_key_from_pin(
+    pin: str,
+    salt: bytes,
+    opslimit: Optional[int] = None,
+    memlimit: Optional[int] = None
+) -> bytes:
     """
     Derive a key from PIN using Argon2id.
     
     Args:
         pin: User's PIN code
         salt: Salt for key derivation
+        opslimit: Argon2id ops limit (defaults to OPSLIMIT_MODERATE)
+        memlimit: Argon2id memory limit (defaults to MEMLIMIT_MODERATE)
     
     Returns:
         32-byte derived key
+    
+    Raises:
+        KeyDerivationError: If Argon2id fails (bad salt, out of memory)
     """
-    # Argon2id parameters (secure defaults)
-    return argon2id.kdf(
-        size=MASTER_KEY_SIZE,
-        password=pin.encode("utf-8"),
-        salt=salt,
-        opslimit=argon2id.OPSLIMIT_MODERATE,
-        memlimit=argon2id.MEMLIMIT_MODERATE
-    )
+    # Vaults created before calibration existed carry no stored params
+    # and were encrypted with the MODERATE defaults
+    try:
+        return argon2id.kdf(
+            size=MASTER_KEY_SIZE,
+            password=pin.encode("utf-8"),
+            salt=salt,
+            opslimit=opslimit or argon2id.OPSLIMIT_MODERATE,
+            memlimit=memlimit or argon2id.MEMLIMIT_MODERATE
+        )
+    except Exception as e:
+        raise KeyDerivationError("Failed to derive key from PIN.") from e
 
 
-def encrypt_master_key(master_key: bytes, pin: str) -> Tuple[bytes, bytes, bytes]:
+def calibrate_kdf_params(target_seconds: float = KDF_TARGET_SECONDS) -> Tuple[int, int]:
+    """
+    Pick Argon2id parameters that take roughly target_seconds on this machine.
+    
+    Starts from the INTERACTIVE preset and doubles the ops limit until one
+    derivation crosses the target.
+    
+    Args:
+        target_seconds: Desired wall time for one derivation
+    
+    Returns:
+        Tuple of (opslimit, memlimit)
+    """
+    opslimit = argon2id.OPSLIMIT_INTERACTIVE
+    memlimit = argon2id.MEMLIMIT_INTERACTIVE
+    salt = generate_salt()
+    
+    while opslimit * 2 <= argon2id.OPSLIMIT_MAX:
+        start = time.perf_counter()
+        derive_key_from_pin("calibration", salt, opslimit, memlimit)
+        if time.perf_counter() - start >= target_seconds:
+            break
+        opslimit *= 2
+    
+    return opslimit, memlimit
+
+
+def encrypt_master_key(
+    master_key: bytes,
+    pin: str,
+    opslimit: Optional[int] = None,
+    memlimit: Optional[int] = None
+) -> Tuple[bytes, bytes, bytes]:
     """
     Encrypt the master key with a PIN-derived key.
     
     Args:
         master_key: The master key to encrypt
         pin: User's PIN code
+        opslimit: Argon2id ops limit (defaults to OPSLIMIT_MODERATE)
+        memlimit: Argon2id memory limit (defaults to MEMLIMIT_MODERATE)
     
     Returns:
         Tuple of (encrypted_key, salt, nonce)
     """
     salt = generate_salt()
-    derived_key = derive_key_from_pin(pin, salt)
-    
-    box = SecretBox(derived_key)
-    nonce = nacl_random(NONCE_SIZE)
-    encrypted = box.encrypt(master_key, nonce)
+    derived_key = derive_key_from_pin(pin, salt, opslimit, memlimit)
+    ciphertext, nonce = encrypt_master_key_with_key(master_key, derived_key)
+    return ciphertext, salt, nonce
+
+
+def encrypt_master_key_with_key(master_key: bytes, derived_key: bytes) -> Tuple[bytes, bytes]:
+    """
+    Encrypt the master key with an already derived PIN key.
     
-    # SecretBox.encrypt returns nonce + ciphertext, extract just ciphertext
-    ciphertext = encrypted.ciphertext
+    Args:
+        master_key: The master key to encrypt
+        derived_key: Key returned by derive_key_from_pin
     
-    return ciphertext, salt, nonce
+    Returns:
+        Tuple of (encrypted_key, nonce)
+    """
+    nonce = nacl_random(NONCE_SIZE)
+    return crypto_secretbox(master_key, nonce, derived_key), nonce
 
 
 def decrypt_master_key(
     encrypted_key: bytes,
     pin: str,
     salt: bytes,
-    nonce: bytes
+    nonce: bytes,
+    opslimit: Optional[int] = None,
+    memlimit: Optional[int] = None
 ) -> bytes:
     """
     Decrypt the master key with a PIN-derived key.
@@ -104,6 +179,35 @@ def decrypt_master_key(
         pin: User's PIN code
         salt: Salt used during encryption
         nonce: Nonce used during encryption
+        opslimit: Argon2id ops limit used during encryption
+        memlimit: Argon2id memory limit used during encryption
+    
+    Returns:
+        Decrypted master key
+    
+    Raises:
+        KeyDerivationError: If Argon2id fails (bad salt, out of memory)
+        CryptoError: If decryption fails (wrong PIN)
+    """
+    derived_key = derive_key_from_pin(pin, salt, opslimit, memlimit)
+    return decrypt_master_key_with_key(encrypted_key, derived_key, nonce)
+
+
+def decrypt_master_key_with_key(
+    encrypted_key: bytes,
+    derived_key: bytes,
+    nonce: bytes
+) -> bytes:
+    """
+    Decrypt the master key with an already derived PIN key.
+    
+    Lets callers run Argon2id once and reuse the result instead of
+    paying the KDF again on every decrypt.
+    
+    Args:
+        encrypted_key: The encrypted master key
+        derived_key: Key returned by derive_key_from_pin
+        nonce: Nonce used during encryption
     
     Returns:
         Decrypted master key
@@ -112,11 +216,12 @@ def decrypt_master_key(
         CryptoError: If decryption fails (wrong PIN)
     """
     try:
-        derived_key = derive_key_from_pin(pin, salt)
-        box = SecretBox(derived_key)
-        return box.decrypt(encrypted_key, nonce)
-    except Exception as e:
+        return crypto_secretbox_open(encrypted_key, nonce, derived_key)
+    except NaclCryptoError as e:
         raise CryptoError("Failed to decrypt master key. Invalid PIN.") from e
+    except (TypeError, ValueError) as e:
+        # Wrong nonce/ciphertext length: the stored blob is damaged
+        raise CryptoError("Encrypted master key is malformed.") from e
 
 
 def compute_key_hash(key: bytes) -> str:
@@ -129,7 +234,12 @@ def compute_key_hash(key: bytes) -> str:
     Returns:
         Hex-encoded hash string
     """
-    return blake2b(key, digest_size=32, encoder=RawEncoder).hex()
+    return _key_digest(key).hex()
+
+
+def _key_digest(key: bytes) -> bytes:
+    """Raw 32-byte BLAKE2b digest of a key."""
+    return blake2b(key, digest_size=32, encoder=RawEncoder)
 
 
 def verify_key_hash(key: bytes, expected_hash: str) -> bool:
@@ -143,7 +253,12 @@ def verify_key_hash(key: bytes, expected_hash: str) -> bool:
     Returns:
         True if hash matches, False otherwise
     """
-    return compute_key_hash(key) == expected_hash
+    try:
+        expected = bytes.fromhex(expected_hash)
+    except (TypeError, ValueError):
+        return False
+    # Constant-time comparison of the raw digests (no early exit on mismatch)
+    return hmac.compare_digest(_key_digest(key), expected)
 
 
 def derive_file_key(master_key: bytes, salt: bytes) -> bytes:
@@ -165,27 +280,39 @@ def derive_file_key(master_key: bytes, salt: bytes) -> bytes:
     )
 
 
-def encrypt_block(data: bytes, key: bytes) -> Tuple[bytes, bytes]:
+def encrypt_block(data: bytes, key: bytes, nonce: Optional[bytes] = None) -> Tuple[bytes, bytes]:
     """
     Encrypt a data block.
     
+    The cipher follows the nonce length: 12-byte nonces select
+    ChaCha20-Poly1305-IETF, 24-byte nonces select XSalsa20-Poly1305.
+    
     Args:
         data: Data to encrypt
         key: Encryption key
+        nonce: Nonce to use; its length picks the cipher. Must never repeat
+            under the same key. If None, a random 12-byte nonce is drawn,
+            which is only safe for keys used on a single block.
     
     Returns:
         Tuple of (encrypted_data, nonce)
     """
-    box = SecretBox(key)
-    nonce = nacl_random(NONCE_SIZE)
-    encrypted = box.encrypt(data, nonce)
-    return encrypted.ciphertext, nonce
+    if nonce is None:
+        nonce = nacl_random(BLOCK_NONCE_SIZE)
+    if len(nonce) == BLOCK_NONCE_SIZE:
+        return crypto_aead_chacha20poly1305_ietf_encrypt(data, None, nonce, key), nonce
+    # Call libsodium directly: building a SecretBox (key copy +
+    # EncryptedMessage wrapper) per call is pure overhead
+    return crypto_secretbox(data, nonce, key), nonce
 
 
 def decrypt_block(encrypted_data: bytes, key: bytes, nonce: bytes) -> bytes:
     """
     Decrypt a data block.
     
+    Blocks written before ChaCha20-Poly1305-IETF was adopted carry 24-byte
+    nonces and are still opened with XSalsa20-Poly1305.
+    
     Args:
         encrypted_data: Encrypted data
         key: Decryption key
@@ -198,8 +325,9 @@ def decrypt_block(encrypted_data: bytes, key: bytes, nonce: bytes) -> bytes:
         CryptoError: If decryption fails
     """
     try:
-        box = SecretBox(key)
-        return box.decrypt(encrypted_data, nonce)
+        if len(nonce) == BLOCK_NONCE_SIZE:
+            return crypto_aead_chacha20poly1305_ietf_decrypt(encrypted_data, None, nonce, key)
+        return crypto_secretbox_open(encrypted_data, nonce, key)
     except Exception as e:
         raise CryptoError("Failed to decrypt block") from e
 
@@ -215,7 +343,9 @@ def encrypt_metadata(data: str, key: bytes) -> Tuple[bytes, bytes]:
     Returns:
         Tuple of (encrypted_data, nonce)
     """
-    return encrypt_block(data.encode("utf-8"), key)
+    # Metadata is encrypted directly under the master key, so keep the
+    # 192-bit random nonces of XSalsa20-Poly1305
+    return encrypt_block(data.encode("utf-8"), key, nacl_random(NONCE_SIZE))
 
 
 def decrypt_metadata(encrypted_data: bytes, key: bytes, nonce: bytes) -> str:
@@ -244,6 +374,20 @@ def generate_random_password(length: int = 32) -> str:
     Returns:
         Random password string
     """
-    # Use URL-safe characters for compatibility
-    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+    out = bytearray(length)
+    n = len(PASSWORD_ALPHABET)
+    mask = (1 << n.bit_length()) - 1
+    got = 0
+    
+    # Rejection sampling over one urandom draw per round: masked values
+    # >= n are discarded so every character stays uniformly distributed
+    while got < length:
+        for b in os.urandom((length - got) * 2):
+            v = b & mask
+            if v < n:
+                out[got] = PASSWORD_ALPHABET[v]
+                got += 1
+                if got == length:
+                    break
+    
+    return out.decode("ascii")
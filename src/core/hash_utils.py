@@ -3,15 +3,62 @@ Secure Vault - Hash Utilities
 Provides hashing functions for file deduplication and integrity verification.
 """
 
+import hashlib
+import mmap
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
-
-from nacl.hash import blake2b
-from nacl.encoding import RawEncoder
+from typing import Iterator, Tuple
 
 # Block size for file reading (1 MB)
 READ_BLOCK_SIZE = 1024 * 1024
 
+# Files at least this large are memory-mapped instead of read (16 MB)
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def _advise_sequential(mm: mmap.mmap) -> None:
+    """Hint the kernel to read ahead on a mapped file (no-op where unsupported)."""
+    if not hasattr(mm, "madvise"):
+        return
+    for name in ("MADV_SEQUENTIAL", "MADV_WILLNEED"):
+        advice = getattr(mmap, name, None)
+        if advice is not None:
+            try:
+                mm.madvise(advice)
+            except OSError:
+                pass
+
+
+def _fadvise(fd: int, offset: int, length: int, *names: str) -> None:
+    """Apply posix_fadvise hints by name (no-op where unsupported, e.g. Windows)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for name in names:
+        advice = getattr(os, name, None)
+        if advice is not None:
+            try:
+                os.posix_fadvise(fd, offset, length, advice)
+            except OSError:
+                pass
+
+
+@contextmanager
+def _sequential_scan(f, offset: int = 0, length: int = 0) -> Iterator[None]:
+    """
+    Bracket a one-pass read of a file region with readahead hints.
+    
+    Asks the kernel to read ahead aggressively before the scan and to drop
+    the cached pages afterwards, so large imports do not evict the rest of
+    the page cache. A length of 0 means "to the end of the file".
+    """
+    fd = f.fileno()
+    _fadvise(fd, offset, length, "POSIX_FADV_SEQUENTIAL", "POSIX_FADV_WILLNEED")
+    try:
+        yield
+    finally:
+        _fadvise(fd, offset, length, "POSIX_FADV_DONTNEED")
+
 
 def compute_block_hash(data: bytes) -> str:
     """
@@ -23,7 +70,9 @@ def compute_block_hash(data: bytes) -> str:
     Returns:
         Hex-encoded BLAKE2b hash
     """
-    return blake2b(data, digest_size=32, encoder=RawEncoder).hex()
+    # hexdigest() encodes in C straight from the hash state, skipping the
+    # intermediate bytes object PyNaCl's RawEncoder + .hex() produced
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
 
 
 def compute_file_hash(file_path: Path) -> str:
@@ -36,20 +85,30 @@ def compute_file_hash(file_path: Path) -> str:
     Returns:
         Hex-encoded BLAKE2b hash
     """
-    # Use incremental hashing for large files
-    from nacl.bindings import (
-        crypto_generichash_blake2b_init,
-        crypto_generichash_blake2b_update,
-        crypto_generichash_blake2b_final
-    )
-    
-    state = crypto_generichash_blake2b_init(digest_size=32)
-    
-    with open(file_path, "rb") as f:
-        while chunk := f.read(READ_BLOCK_SIZE):
-            crypto_generichash_blake2b_update(state, chunk)
-    
-    return crypto_generichash_blake2b_final(state).hex()
+    # hashlib's BLAKE2b-256 produces the same digest as libsodium's
+    # crypto_generichash, but accepts memoryviews, so the read buffer
+    # can be reused without a bytes copy per chunk
+    state = hashlib.blake2b(digest_size=32)
+    
+    # Large files: map them so the kernel prefetches ahead of the hash loop
+    # and no userspace read() copy is made
+    if os.path.getsize(file_path) >= MMAP_THRESHOLD:
+        with open(file_path, "rb") as f, _sequential_scan(f), \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _advise_sequential(mm)
+            view = memoryview(mm)
+            try:
+                for offset in range(0, len(mm), READ_BLOCK_SIZE):
+                    state.update(view[offset:offset + READ_BLOCK_SIZE])
+            finally:
+                view.release()
+        return state.hexdigest()
+    
+    buf = bytearray(READ_BLOCK_SIZE)
+    for chunk in iter_file_blocks_into(file_path, buf):
+        state.update(chunk)
+    
+    return state.hexdigest()
 
 
 def iter_file_blocks(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
@@ -63,11 +122,57 @@ def iter_file_blocks(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> Iter
     Yields:
         Data blocks
     """
-    with open(file_path, "rb") as f:
+    with open(file_path, "rb") as f, _sequential_scan(f):
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _advise_sequential(mm)
+                for offset in range(0, len(mm), block_size):
+                    yield mm[offset:offset + block_size]
+            return
+        
         while chunk := f.read(block_size):
             yield chunk
 
 
+def iter_file_blocks_into(file_path: Path, buf: bytearray) -> Iterator[memoryview]:
+    """
+    Iterate over file in blocks, reading into a caller-supplied buffer.
+    
+    Each yielded view aliases ``buf`` and is only valid until the next
+    iteration; consumers that keep the data must copy it.
+    
+    Args:
+        file_path: Path to the file
+        buf: Reusable buffer; its length sets the block size
+    
+    Yields:
+        Memoryview slices of buf holding the data read
+    """
+    view = memoryview(buf)
+    try:
+        with open(file_path, "rb", buffering=0) as f, _sequential_scan(f):
+            while n := f.readinto(buf):
+                yield view[:n]
+    finally:
+        view.release()
+
+
+def stat_and_blocks(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> Tuple[int, int]:
+    """
+    Get file size and block count from a single stat call.
+    
+    Args:
+        file_path: Path to the file
+        block_size: Size of each block
+    
+    Returns:
+        Tuple of (file size in bytes, number of blocks)
+    """
+    file_size = os.stat(file_path).st_size
+    return file_size, (file_size + block_size - 1) // block_size
+
+
 def count_file_blocks(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> int:
     """
     Count the number of blocks in a file.
@@ -79,8 +184,7 @@ def count_file_blocks(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> int
     Returns:
         Number of blocks
     """
-    file_size = file_path.stat().st_size
-    return (file_size + block_size - 1) // block_size
+    return stat_and_blocks(file_path, block_size)[1]
 
 
 def get_file_size(file_path: Path) -> int:
@@ -93,7 +197,10 @@ def get_file_size(file_path: Path) -> int:
     Returns:
         File size in bytes
     """
-    return file_path.stat().st_size
+    return os.stat(file_path).st_size
+
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
 
 def format_size(size_bytes: int) -> str:
@@ -109,11 +216,9 @@ def format_size(size_bytes: int) -> str:
     if size_bytes < 0:
         return "-"
     
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024:
-            if unit == "B":
-                return f"{size_bytes} {unit}"
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    
-    return f"{size_bytes:.2f} PB"
+    size_bytes = int(size_bytes)
+    # Each unit is 2**10 of the previous one, so bit_length picks it directly
+    unit = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1) if size_bytes else 0
+    if unit == 0:
+        return f"{size_bytes} B"
+    return f"{size_bytes / (1 << (10 * unit)):.2f} {SIZE_UNITS[unit]}"
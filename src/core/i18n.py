@@ -3,6 +3,8 @@ Secure Vault - Internationalization (I18n)
 Provides translation support for Chinese and English.
 """
 
+from functools import lru_cache
+
 from src.core.config import get_config
 
 # Translation dictionary
@@ -22,6 +24,8 @@ TRANSLATIONS = {
         'btn_confirm': '确认',
         'btn_unlock': '解锁',
         'subtitle_unlock': '请输入 PIN 码解锁',
+        'btn_unlocking': '解锁中...',
+        'msg_securing_key': '正在保护主密钥...',
         'btn_exit': '退出',
         'label_success': '成功',
         'label_error': '错误',
@@ -34,6 +38,9 @@ TRANSLATIONS = {
         'error_pin_mismatch': '两次输入的 PIN 码不一致',
         'error_pin_required': '请输入 PIN 码',
         'error_pin_invalid': 'PIN 码错误',
+        'error_key_derivation': '密钥派生失败，配置可能已损坏',
+        'error_pin_change_failed': '修改 PIN 码失败: {error}',
+        'error_config_corrupted': '配置文件已损坏: {error}',
         
         # Tooltips
         'tooltip_switch_repo': '切换仓库',
@@ -180,6 +187,7 @@ TRANSLATIONS = {
         'placeholder_new_pin': '输入新 PIN 码 (至少 4 位)',
         'placeholder_confirm_new_pin': '再次输入新 PIN 码',
         'btn_change': '修改',
+        'btn_changing': '修改中...',
         'error_current_pin_required': '请输入当前 PIN 码',
         'error_new_pin_min_length': '新 PIN 码至少需要 4 位',
         'error_new_pin_mismatch': '两次输入的新 PIN 码不一致',
@@ -288,6 +296,8 @@ TRANSLATIONS = {
         'btn_confirm': 'Confirm',
         'btn_unlock': 'Unlock',
         'subtitle_unlock': 'Please enter PIN to unlock',
+        'btn_unlocking': 'Unlocking...',
+        'msg_securing_key': 'Securing master key...',
         'btn_exit': 'Exit',
         'label_success': 'Success',
         'label_error': 'Error',
@@ -300,6 +310,9 @@ TRANSLATIONS = {
         'error_pin_mismatch': 'PINs do not match',
         'error_pin_required': 'PIN is required',
         'error_pin_invalid': 'Incorrect PIN',
+        'error_key_derivation': 'Key derivation failed; the configuration may be corrupted',
+        'error_pin_change_failed': 'Failed to change PIN: {error}',
+        'error_config_corrupted': 'Configuration is corrupted: {error}',
         
         # Tooltips
         'tooltip_switch_repo': 'Switch Repository',
@@ -446,6 +459,7 @@ TRANSLATIONS = {
         'placeholder_new_pin': 'Enter new PIN (at least 4 digits)',
         'placeholder_confirm_new_pin': 'Re-enter new PIN',
         'btn_change': 'Change',
+        'btn_changing': 'Changing...',
         'error_current_pin_required': 'Current PIN is required',
         'error_new_pin_min_length': 'New PIN must be at least 4 digits',
         'error_new_pin_mismatch': 'New PINs do not match',
@@ -541,14 +555,9 @@ TRANSLATIONS = {
     }
 }
 
-def _(key, **kwargs):
-    """
-    Translate a key into the current language.
-    Supports pluralization/interpolation via kwargs.
-    """
-    config = get_config()
-    lang = config.language
-    
+@lru_cache(maxsize=1024)
+def _lookup(lang: str, key: str) -> str:
+    """Resolve a key for a language, with fallbacks (cached per language)."""
     # Fallback to English if key doesn't exist in desired language
     translated = TRANSLATIONS.get(lang, TRANSLATIONS['zh']).get(key, key)
     
@@ -559,6 +568,17 @@ def _(key, **kwargs):
     # If still not found and not Chinese, try Chinese
     if translated == key and lang != 'zh':
         translated = TRANSLATIONS['zh'].get(key, key)
+    
+    return translated
+
+
+def _(key, **kwargs):
+    """
+    Translate a key into the current language.
+    Supports pluralization/interpolation via kwargs.
+    """
+    # The language is part of the cache key, so switching needs no invalidation
+    translated = _lookup(get_config().language, key)
         
     # Apply interpolation
     if kwargs:
@@ -4,20 +4,138 @@ SQLite database connection and management with per-repository support.
 """
 
 import os
+import queue
 import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Optional, List, Tuple
 from contextlib import contextmanager
+from functools import lru_cache
 
 from src.core.config import get_config
 
 
+# Memory-mapped I/O window: 1 GB, clamped to 256 MB on 32-bit builds where
+# address space is scarce
+MMAP_SIZE = 1024 * 1024 * 1024 if sys.maxsize > 2 ** 32 else 256 * 1024 * 1024
+
+# Connection tuning applied to every database: WAL lets UI reads proceed
+# while an import is writing, and synchronous=NORMAL is durable in WAL mode
+# (only the last commits can be lost on power failure, never corruption)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+
+# Per-connection prepared statement cache (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Rows sampled per index when PRAGMA optimize runs ANALYZE
+ANALYSIS_LIMIT = 1000
+
+# Hot repository queries. Models use these exact strings so they share the
+# statement cache entries that _warm_statements prepares at connect time.
+SQL_BLOCK_BY_HASH = "SELECT * FROM blocks WHERE hash = ?"
+SQL_FILES_BY_PARENT = "SELECT * FROM files WHERE parent_id = ?"
+SQL_FILES_AT_ROOT = "SELECT * FROM files WHERE parent_id IS NULL"
+SQL_BLOCKS_FOR_FILE = (
+    "SELECT b.* FROM blocks b "
+    "INNER JOIN file_blocks fb ON b.id = fb.block_id "
+    "WHERE fb.file_id = ? "
+    "ORDER BY fb.block_order"
+)
+
+# (query, params that match no rows) used to prepare the statements above
+WARM_QUERIES = (
+    (SQL_BLOCK_BY_HASH, ("",)),
+    (SQL_FILES_BY_PARENT, (-1,)),
+    (SQL_FILES_AT_ROOT, ()),
+    (SQL_BLOCKS_FOR_FILE, (-1,)),
+)
+
+# Filesystem types on which SQLite's shared-memory WAL index is unsafe
+NETWORK_FS_TYPES = ("nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "fuse.sshfs", "afs")
+
+
+@lru_cache(maxsize=None)
+def _is_network_path(path: Path) -> bool:
+    """
+    Best-effort check whether a path lives on a network filesystem.
+    
+    Cached per path: the main connection and every pool connection of a
+    database share one lookup instead of each rescanning the mount table.
+    """
+    path_str = str(path)
+    if os.name == 'nt':
+        if path_str.startswith("\\\\"):
+            return True  # UNC share
+        drive = os.path.splitdrive(path_str)[0]
+        if not drive:
+            return False
+        try:
+            import ctypes
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+        except Exception:
+            return False
+    
+    # POSIX: find the longest mount point containing the path
+    try:
+        resolved = os.path.realpath(path_str)
+        best_mount, best_type = "", ""
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point, fs_type = parts[1], parts[2]
+                if (resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/")) \
+                        and len(mount_point) > len(best_mount):
+                    best_mount, best_type = mount_point, fs_type
+        return best_type in NETWORK_FS_TYPES
+    except OSError:
+        return False
+
+
+def _is_read_only(query: str) -> bool:
+    """Whether a statement is a plain SELECT that never writes."""
+    return query.lstrip()[:6].upper() == "SELECT"
+
+
+def _configure_connection(conn: sqlite3.Connection, db_path: Path) -> None:
+    """Apply journal mode and performance pragmas to a new connection."""
+    # WAL needs shared memory between processes, which network filesystems
+    # do not provide reliably; keep the rollback journal there
+    if not _is_network_path(db_path.parent):
+        conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def _warm_statements(conn: sqlite3.Connection) -> None:
+    """Prepare the hot repository queries into the connection's cache."""
+    for query, params in WARM_QUERIES:
+        conn.execute(query, params).fetchall()
+
+
 class RepositoryDatabase:
     """SQLite database manager for a single repository."""
     
     VAULT_DIR = ".vault"
     DB_NAME = "vault.db"
     BLOCKS_DIR = "blocks"
+    READ_POOL_SIZE = 4
+    # Queued writes are committed together once this many are waiting or
+    # the oldest has waited this long
+    WRITE_BATCH_SIZE = 500
+    WRITE_BATCH_SECONDS = 0.010
     
     def __init__(self, repo_path: str):
         self._repo_path = Path(repo_path)
@@ -26,6 +144,16 @@ class RepositoryDatabase:
         self._blocks_path = self._vault_path / self.BLOCKS_DIR
         self._connection: Optional[sqlite3.Connection] = None
         self._transaction_depth = 0
+        # Writes go through _connection, one thread at a time; fetches from
+        # other threads use read-only pool connections and never queue
+        # behind a running import transaction
+        self._write_lock = threading.RLock()
+        self._write_owner: Optional[int] = None
+        self._read_pool: Optional[queue.Queue] = None
+        # Background writer for async_execute, started on first use
+        self._write_queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_start_lock = threading.Lock()
     
     @property
     def blocks_path(self) -> Path:
@@ -50,50 +178,143 @@ class RepositoryDatabase:
         
         self._connection = sqlite3.connect(
             str(self._db_path),
-            check_same_thread=False
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
         )
         self._connection.row_factory = sqlite3.Row
+        # auto_vacuum only takes effect on an empty file, and switching to
+        # WAL already writes the header page, so it has to come first
+        if self._connection.execute("PRAGMA page_count").fetchone()[0] == 0:
+            self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        _configure_connection(self._connection, self._db_path)
         self._connection.execute("PRAGMA foreign_keys = ON")
+        # Bound the ANALYZE work done by PRAGMA optimize on close
+        self._connection.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
         self._init_schema()
+        self._open_read_pool()
+    
+    def _open_read_pool(self) -> None:
+        """Open read-only connections for fetches made outside the writer."""
+        mode = self._connection.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != "wal":
+            # Without WAL readers block the writer, so share its connection
+            return
+        
+        pool: queue.Queue = queue.Queue()
+        for _ in range(self.READ_POOL_SIZE):
+            conn = sqlite3.connect(
+                str(self._db_path),
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.row_factory = sqlite3.Row
+            _configure_connection(conn, self._db_path)
+            conn.execute("PRAGMA query_only = 1")
+            _warm_statements(conn)
+            pool.put(conn)
+        self._read_pool = pool
+    
+    def _close_read_pool(self) -> None:
+        """Close idle pool connections; busy ones are closed when returned."""
+        pool, self._read_pool = self._read_pool, None
+        if pool is None:
+            return
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def close(self) -> None:
         """Close database connection."""
+        self._stop_writer()
+        self._close_read_pool()
         if self._connection:
+            # Refresh planner statistics for tables whose shape has changed
+            try:
+                self._connection.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             self._connection.close()
             self._connection = None
     
     @contextmanager
     def transaction(self):
-        """Context manager for database transactions with nesting support."""
+        """
+        Context manager for database transactions with nesting support.
+        
+        The outermost level opens BEGIN IMMEDIATE and commits or rolls back;
+        nested levels use SAVEPOINTs, so a failing inner block only undoes
+        its own writes and the caller may catch the error and continue.
+        """
         conn = self._connection
         if conn is None:
             yield
             return
-            
+        
+        self._write_lock.acquire()
+        self._write_owner = threading.get_ident()
         self._transaction_depth += 1
+        depth = self._transaction_depth
+        savepoint = f"sp_{depth}"
+        try:
+            if depth == 1:
+                # Take the write lock up front instead of failing on upgrade;
+                # a transaction already opened implicitly is simply adopted
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+            else:
+                conn.execute(f"SAVEPOINT {savepoint}")
+        except Exception:
+            self._release_write(depth)
+            raise
         try:
             yield
-            if self._transaction_depth == 1:
-                if self._connection and self._connection == conn:
-                    self._connection.commit()
+            if self._connection and self._connection == conn:
+                if depth == 1:
+                    conn.commit()
+                else:
+                    conn.execute(f"RELEASE {savepoint}")
         except Exception:
-            if self._transaction_depth == 1:
-                if self._connection and self._connection == conn:
-                    try:
-                        self._connection.rollback()
-                    except sqlite3.ProgrammingError:
-                        pass # Connection already closed
+            if self._connection and self._connection == conn:
+                try:
+                    if depth == 1:
+                        conn.rollback()
+                    else:
+                        conn.execute(f"ROLLBACK TO {savepoint}")
+                        conn.execute(f"RELEASE {savepoint}")
+                except sqlite3.ProgrammingError:
+                    pass # Connection already closed
             raise
         finally:
-            self._transaction_depth -= 1
+            self._release_write(depth)
+    
+    def _release_write(self, depth: int) -> None:
+        """Leave one transaction level and hand the writer to other threads."""
+        self._transaction_depth = depth - 1
+        if depth == 1:
+            self._write_owner = None
+        self._write_lock.release()
+    
+    def _in_own_transaction(self) -> bool:
+        """Whether the calling thread is inside transaction()."""
+        return self._transaction_depth > 0 and self._write_owner == threading.get_ident()
     
     def execute(
         self,
         query: str,
         params: Tuple = ()
     ) -> sqlite3.Cursor:
-        """Execute a single query."""
-        return self._connection.execute(query, params)
+        """Execute a single query (committed at once outside a transaction)."""
+        if self._in_own_transaction():
+            return self._connection.execute(query, params)
+        if _is_read_only(query):
+            # Reads need no write lock on the file; the RLock only keeps
+            # other threads off the shared connection while it runs
+            with self._write_lock:
+                return self._connection.execute(query, params)
+        with self.transaction():
+            return self._connection.execute(query, params)
     
     def executemany(
         self,
@@ -101,7 +322,153 @@ class RepositoryDatabase:
         params_list: List[Tuple]
     ) -> sqlite3.Cursor:
         """Execute a query with multiple parameter sets."""
-        return self._connection.executemany(query, params_list)
+        if self._in_own_transaction():
+            return self._connection.executemany(query, params_list)
+        with self.transaction():
+            return self._connection.executemany(query, params_list)
+    
+    def async_execute(
+        self,
+        query: str,
+        params=(),
+        many: bool = False
+    ) -> Future:
+        """
+        Queue a write for the background writer thread.
+        
+        Writes queued close together share one transaction, each in its own
+        savepoint so a failing statement does not discard the others.
+        Unlike execute(), the write is not visible to the caller's own
+        transaction; use it for fire-and-forget updates.
+        
+        Args:
+            query: SQL statement
+            params: Parameters, or a list of parameter tuples when many is set
+            many: Run the statement with executemany
+        
+        Returns:
+            Future resolving to the statement's cursor once committed
+        """
+        future: Future = Future()
+        self._ensure_writer()
+        self._write_queue.put((query, params, many, future))
+        return future
+    
+    def _ensure_writer(self) -> None:
+        """Start the background writer thread if it is not running."""
+        with self._writer_start_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._writer_loop,
+                    name="vault-db-writer",
+                    daemon=True
+                )
+                self._writer.start()
+    
+    def _stop_writer(self) -> None:
+        """Flush queued writes and stop the background writer."""
+        with self._writer_start_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            self._write_queue.put(None)
+            writer.join()
+    
+    def _writer_loop(self) -> None:
+        """Drain the write queue in batches until a stop marker arrives."""
+        write_queue = self._write_queue
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.WRITE_BATCH_SECONDS
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply_write_batch(batch)
+            if stop:
+                return
+    
+    def _apply_write_batch(self, batch: list) -> None:
+        """Run queued writes in one transaction and resolve their futures."""
+        done = []
+        try:
+            with self.transaction():
+                for query, params, many, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.transaction():
+                            if many:
+                                cursor = self._connection.executemany(query, params)
+                            else:
+                                cursor = self._connection.execute(query, params)
+                        done.append((future, cursor))
+                    except Exception as e:
+                        future.set_exception(e)
+        except Exception as e:
+            # Commit failed: nothing in the batch was written
+            for future, _ in done:
+                future.set_exception(e)
+            return
+        for future, cursor in done:
+            future.set_result(cursor)
+    
+    def vacuum_incremental(self, n_pages: int = 1024) -> int:
+        """
+        Return up to n_pages free pages to the filesystem.
+        
+        Only repositories created with auto_vacuum=INCREMENTAL are affected;
+        older ones need a full VACUUM and are left alone.
+        
+        Args:
+            n_pages: Maximum number of pages to release
+        
+        Returns:
+            Number of pages released
+        """
+        if self._connection is None:
+            return 0
+        with self.transaction():
+            conn = self._connection
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            count = min(free, n_pages)
+            # Each step of incremental_vacuum frees one page, but sqlite3
+            # only steps a result-less statement once per execute()
+            for _ in range(count):
+                conn.execute("PRAGMA incremental_vacuum(1)")
+        return count
+    
+    def _fetch(self, query: str, params: Tuple, one: bool):
+        """Run a read on the writer (inside own transaction) or a pool connection."""
+        pool = self._read_pool
+        if pool is None or self._in_own_transaction():
+            # Must see this thread's uncommitted writes
+            with self._write_lock:
+                cursor = self._connection.execute(query, params)
+                return cursor.fetchone() if one else cursor.fetchall()
+        
+        conn = pool.get()
+        try:
+            cursor = conn.execute(query, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+        finally:
+            if self._read_pool is pool:
+                pool.put(conn)
+            else:
+                conn.close()  # Pool was closed while this read ran
     
     def fetchone(
         self,
@@ -109,8 +476,7 @@ class RepositoryDatabase:
         params: Tuple = ()
     ) -> Optional[sqlite3.Row]:
         """Execute query and fetch one result."""
-        cursor = self.execute(query, params)
-        return cursor.fetchone()
+        return self._fetch(query, params, True)
     
     def fetchall(
         self,
@@ -118,8 +484,7 @@ class RepositoryDatabase:
         params: Tuple = ()
     ) -> List[sqlite3.Row]:
         """Execute query and fetch all results."""
-        cursor = self.execute(query, params)
-        return cursor.fetchall()
+        return self._fetch(query, params, False)
     
     def _init_schema(self) -> None:
         """Initialize database schema for repository-specific data."""
@@ -173,9 +538,15 @@ class RepositoryDatabase:
         );
         
         -- Indexes for performance
+        -- blocks(hash) and file_blocks(file_id, block_order) are served by
+        -- the UNIQUE / PRIMARY KEY autoindexes: hash lookups of id are
+        -- index-only (id is the rowid) and per-file block scans come back
+        -- in block_order without a sort step
         CREATE INDEX IF NOT EXISTS idx_files_parent ON files(parent_id);
-        CREATE INDEX IF NOT EXISTS idx_blocks_hash ON blocks(hash);
-        CREATE INDEX IF NOT EXISTS idx_file_blocks_file ON file_blocks(file_id);
+        
+        -- Migration: drop indexes that duplicated the autoindexes above
+        DROP INDEX IF EXISTS idx_blocks_hash;
+        DROP INDEX IF EXISTS idx_file_blocks_file;
         """
         self._connection.executescript(schema)
         try:
@@ -183,6 +554,7 @@ class RepositoryDatabase:
         except:
             pass
         self._connection.commit()
+        _warm_statements(self._connection)
 
 
 class GlobalDatabase:
@@ -196,9 +568,11 @@ class GlobalDatabase:
         """Establish database connection."""
         self._connection = sqlite3.connect(
             str(self._db_path),
-            check_same_thread=False
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
         )
         self._connection.row_factory = sqlite3.Row
+        _configure_connection(self._connection, self._db_path)
         self._init_schema()
     
     def close(self) -> None:
@@ -263,6 +637,25 @@ _global_db: Optional[GlobalDatabase] = None
 _repo_db: Optional[RepositoryDatabase] = None
 _current_repo_path: Optional[str] = None
 
+# Resolved repository paths keyed by the caller's raw path; resolve() stats
+# every path component, which is slow on Windows and network drives
+_norm_cache: dict = {}
+_norm_lock = threading.Lock()
+
+
+def _normalize_repo_path(repo_path) -> str:
+    """Resolve a repository path for comparison, caching the result."""
+    norm_path = _norm_cache.get(repo_path)
+    if norm_path is not None:
+        return norm_path
+    try:
+        norm_path = str(Path(repo_path).resolve())
+    except Exception:
+        norm_path = str(repo_path)
+    with _norm_lock:
+        _norm_cache[repo_path] = norm_path
+    return norm_path
+
 
 def get_global_database() -> GlobalDatabase:
     """Get the global database instance."""
@@ -281,10 +674,7 @@ def get_repository_database(repo_path: str = None) -> Optional[RepositoryDatabas
         return _repo_db
         
     # Normalize path for reliable comparison
-    try:
-        norm_path = str(Path(repo_path).resolve())
-    except Exception:
-        norm_path = repo_path
+    norm_path = _normalize_repo_path(repo_path)
     
     # CASE 1: Already have the correct database and it's connected
     if _current_repo_path == norm_path and _repo_db is not None:
@@ -320,6 +710,9 @@ def close_repository_database() -> None:
             pass
         _repo_db = None
         _current_repo_path = None
+    # Paths may be remounted or relinked before the next open
+    with _norm_lock:
+        _norm_cache.clear()
 
 
 def close_all_databases() -> None:
@@ -5,10 +5,13 @@ Data access objects for database operations with per-repository support.
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 import json
 
-from src.database.database import get_global_database, get_repository_database
+from src.database.database import (
+    get_global_database, get_repository_database,
+    SQL_BLOCK_BY_HASH, SQL_FILES_BY_PARENT, SQL_FILES_AT_ROOT, SQL_BLOCKS_FOR_FILE
+)
 
 
 @dataclass
@@ -250,14 +253,9 @@ class VirtualFile:
         if db is None:
             return []
         if parent_id is None:
-            rows = db.fetchall(
-                "SELECT * FROM files WHERE parent_id IS NULL"
-            )
+            rows = db.fetchall(SQL_FILES_AT_ROOT)
         else:
-            rows = db.fetchall(
-                "SELECT * FROM files WHERE parent_id = ?",
-                (parent_id,)
-            )
+            rows = db.fetchall(SQL_FILES_BY_PARENT, (parent_id,))
         return [cls._from_row(row) for row in rows]
     
     @classmethod
@@ -412,11 +410,44 @@ class Block:
         db = get_repository_database(repo_path)
         if db is None:
             return None
-        row = db.fetchone("SELECT * FROM blocks WHERE hash = ?", (block_hash,))
+        row = db.fetchone(SQL_BLOCK_BY_HASH, (block_hash,))
         if row:
             return cls._from_row(row)
         return None
     
+    @classmethod
+    def get_ids_by_hash(cls, hashes: List[str], repo_path: str = None) -> Dict[str, int]:
+        """
+        Get the IDs of already stored blocks for many hashes (batched dedup).
+        
+        Only hash and id are selected, which the UNIQUE index on hash covers,
+        so the salt/nonce BLOBs of existing blocks are never read.
+        
+        Args:
+            hashes: Block hashes to look up (duplicates allowed)
+            repo_path: Repository path
+        
+        Returns:
+            Mapping of hash to block ID for the hashes already stored
+        """
+        db = get_repository_database(repo_path)
+        if db is None or not hashes:
+            return {}
+        
+        unique = list(dict.fromkeys(hashes))
+        results = {}
+        CHUNK_SIZE = 900
+        for i in range(0, len(unique), CHUNK_SIZE):
+            chunk = unique[i:i + CHUNK_SIZE]
+            placeholders = ",".join(["?"] * len(chunk))
+            rows = db.fetchall(
+                f"SELECT hash, id FROM blocks WHERE hash IN ({placeholders})",
+                tuple(chunk)
+            )
+            for row in rows:
+                results[row["hash"]] = row["id"]
+        return results
+    
     @classmethod
     def create(
         cls,
@@ -452,6 +483,50 @@ class Block:
             reference_count=1
         )
     
+    @classmethod
+    def create_many(
+        cls,
+        rows: List[Tuple[str, str, int, bytes, bytes]],
+        repo_path: str = None
+    ) -> Dict[str, int]:
+        """
+        Create many block entries with a single executemany.
+        
+        Args:
+            rows: (hash, relative_path, size, salt, nonce) per new block
+            repo_path: Repository path
+        
+        Returns:
+            Mapping of block hash to new block ID
+        """
+        if not rows:
+            return {}
+        db = get_repository_database(repo_path)
+        if db is None:
+            raise RuntimeError("Database not available")
+        
+        with db.transaction():
+            db.executemany(
+                """
+                INSERT INTO blocks (hash, relative_path, size, salt, nonce, reference_count)
+                VALUES (?, ?, ?, ?, ?, 1)
+                """,
+                rows
+            )
+            # executemany does not report per-row IDs; read them back by hash
+            hashes = [row[0] for row in rows]
+            ids = {}
+            CHUNK_SIZE = 900
+            for i in range(0, len(hashes), CHUNK_SIZE):
+                chunk = hashes[i:i + CHUNK_SIZE]
+                placeholders = ",".join(["?"] * len(chunk))
+                for row in db.fetchall(
+                    f"SELECT id, hash FROM blocks WHERE hash IN ({placeholders})",
+                    tuple(chunk)
+                ):
+                    ids[row["hash"]] = row["id"]
+        return ids
+    
     @classmethod
     def _from_row(cls, row) -> "Block":
         """Create Block from database row."""
@@ -521,12 +596,11 @@ class Block:
             
         blocks_to_delete = []
         with db.transaction():
-            # Decrement all
-            for block_id in block_ids:
-                db.execute(
-                    "UPDATE blocks SET reference_count = reference_count - 1 WHERE id = ?",
-                    (block_id,)
-                )
+            # Decrement all (one row per reference, so repeats count twice)
+            db.executemany(
+                "UPDATE blocks SET reference_count = reference_count - 1 WHERE id = ?",
+                [(block_id,) for block_id in block_ids]
+            )
             
             # Find those that reach zero
             placeholders = ",".join(["?"] * len(block_ids))
@@ -594,15 +668,7 @@ class FileBlockMapping:
         db = get_repository_database(repo_path)
         if db is None:
             return []
-        rows = db.fetchall(
-            """
-            SELECT b.* FROM blocks b
-            INNER JOIN file_blocks fb ON b.id = fb.block_id
-            WHERE fb.file_id = ?
-            ORDER BY fb.block_order
-            """,
-            (file_id,)
-        )
+        rows = db.fetchall(SQL_BLOCKS_FOR_FILE, (file_id,))
         return [Block._from_row(row) for row in rows]
     
     @staticmethod
@@ -712,12 +778,15 @@ class Operation:
 
     def update_progress(self, repo_path: str, processed_size: int) -> None:
         db = get_repository_database(repo_path)
-        # Avoid too many DB updates for progress
-        db.execute(
+        # Fire-and-forget: progress only matters for resuming, so the caller
+        # (a worker, or the GUI heartbeat) never waits behind an import
+        # transaction; the writer commits queued updates in order and
+        # close() flushes any still pending
+        db.async_execute(
             "UPDATE operations SET processed_size = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
             (processed_size, self.id)
         )
-        self.processed_size = processed_size 
+        self.processed_size = processed_size
 
     @classmethod
     def get_pending(cls, repo_path: str) -> List["Operation"]:
@@ -4,10 +4,12 @@ Handles encrypted block storage with deduplication.
 Blocks are stored in repository/.vault/blocks/
 """
 
+import os
 import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Iterable, Iterator
 
 from src.core.crypto import (
     derive_file_key, encrypt_block, decrypt_block, generate_salt
@@ -17,6 +19,84 @@ from src.database.models import Block
 from src.database.database import get_repository_database
 
 
+# Shared pool for block preparation; hashing and encryption release the GIL,
+# so it is sized to the CPU count and reused across imports
+_prepare_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_prepare_executor() -> ThreadPoolExecutor:
+    """Get the shared block preparation pool, creating it on first use."""
+    global _prepare_executor
+    if _prepare_executor is None:
+        _prepare_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4,
+            thread_name_prefix="block-prepare"
+        )
+    return _prepare_executor
+
+
+# O_BINARY keeps Windows from translating newlines in ciphertext
+_BLOCK_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_block_raw(path: Path, data: bytes) -> None:
+    """
+    Write an encrypted block straight to disk without a Python file object.
+    
+    Block payloads are never re-read soon after import, so on POSIX the
+    written range is dropped from the page cache to keep it for SQLite.
+    """
+    fd = os.open(path, _BLOCK_WRITE_FLAGS, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(fd, 0, len(data), os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+    finally:
+        os.close(fd)
+
+
+_BLOCK_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _read_block_raw(path: Path) -> bytes:
+    """
+    Read an encrypted block in one pass without a Python file object.
+    
+    PyNaCl only accepts bytes, so the payload is read straight into one
+    bytes object sized from fstat; on POSIX the range is then dropped from
+    the page cache so large exports do not hold every block twice.
+    """
+    fd = os.open(path, _BLOCK_READ_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        if len(data) < size:
+            # Short read (e.g. network shares): collect the remainder
+            chunks = [data]
+            remaining = size - len(data)
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            data = b"".join(chunks)
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+        return data
+    finally:
+        os.close(fd)
+
+
 class BlockManager:
     """Manages encrypted block storage."""
     
@@ -37,6 +117,9 @@ class BlockManager:
         
         # Ensure blocks directory exists
         self.blocks_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Shard directories ("ab/cd") already created by this manager
+        self._known_dirs: set = set()
     
     def prepare_block(self, data: bytes) -> dict:
         """
@@ -74,6 +157,35 @@ class BlockManager:
             "original_size": len(data)
         }
 
+    def _write_block_file(self, relative_path: str, data: bytes) -> None:
+        """Write a block payload, creating its shard directory once per manager."""
+        full_path = self.blocks_dir.joinpath(relative_path)
+        shard = relative_path.rsplit("/", 1)[0]
+        if shard not in self._known_dirs:
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(shard)
+        try:
+            _write_block_raw(full_path, data)
+        except FileNotFoundError:
+            # Shard removed behind our back: recreate and retry once
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_block_raw(full_path, data)
+
+    def prepare_blocks_parallel(self, datas: Iterable[bytes]) -> Iterator[dict]:
+        """
+        Prepare many blocks on the shared CPU thread pool.
+        
+        Each block is submitted as soon as it is pulled from ``datas``, so
+        reading the next block overlaps with preparing the previous ones.
+        
+        Args:
+            datas: Raw block data
+            
+        Returns:
+            Iterator of prepare_block results, in input order
+        """
+        return _get_prepare_executor().map(self.prepare_block, datas)
+
     def store_prepared_block(self, prepared: dict) -> Tuple[Block, bool]:
         """
         Store a previously prepared block into the database and disk.
@@ -91,17 +203,9 @@ class BlockManager:
             existing_block.increment_reference(str(self.repository_path))
             return existing_block, False
         
-        # Determine target directory
-        target_dir = self.blocks_dir
-            
         # Write encrypted block to disk (IO)
-        full_path = target_dir / prepared["relative_path"]
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_block_file(prepared["relative_path"], prepared["encrypted_data"])
         
-        with open(full_path, "wb") as f:
-            f.write(prepared["encrypted_data"])
-        
-            
         # Create block record in database (DB)
         block = Block.create(
             block_hash=prepared["hash"],
@@ -115,6 +219,81 @@ class BlockManager:
         
         return block, True
 
+    def store_prepared_blocks(self, prepared_list: List[dict]) -> List[Tuple[int, bool]]:
+        """
+        Store a batch of prepared blocks in one transaction.
+        
+        Dedup is resolved with one hash lookup for the whole batch, new
+        blocks are inserted with one executemany and duplicates get their
+        reference counts bumped with another, so the batch commits once.
+        Repeated hashes inside the batch are stored once and counted as
+        duplicates of the first occurrence.
+        
+        Args:
+            prepared_list: Dictionaries from prepare_block
+            
+        Returns:
+            List of (block ID, is_new_block) in input order
+        """
+        if not prepared_list:
+            return []
+        
+        repo_path = str(self.repository_path)
+        db = get_repository_database(repo_path)
+        
+        with db.transaction():
+            # Dedup against the database in a single roundtrip
+            existing = Block.get_ids_by_hash(
+                [p["hash"] for p in prepared_list], repo_path
+            )
+            
+            new_rows = []
+            pending = set()
+            increments: dict = {}  # hash -> extra references
+            
+            # Bind per-block callables once; the loop runs for every block
+            write_block_file = self._write_block_file
+            add_pending = pending.add
+            add_row = new_rows.append
+            get_increment = increments.get
+            for prepared in prepared_list:
+                block_hash = prepared["hash"]
+                if block_hash in existing or block_hash in pending:
+                    increments[block_hash] = get_increment(block_hash, 0) + 1
+                    continue
+                
+                # Write encrypted block to disk (IO)
+                write_block_file(prepared["relative_path"], prepared["encrypted_data"])
+                
+                add_pending(block_hash)
+                add_row((
+                    block_hash,
+                    prepared["relative_path"],
+                    prepared["size"],
+                    prepared["salt"],
+                    prepared["nonce"]
+                ))
+            
+            created = Block.create_many(new_rows, repo_path)
+            ids = {**existing, **created}
+            
+            if increments:
+                db.executemany(
+                    "UPDATE blocks SET reference_count = reference_count + ? WHERE id = ?",
+                    [(count, ids[h]) for h, count in increments.items()]
+                )
+        
+        # The first occurrence of a hash not previously stored is the new one
+        results = []
+        seen_new = set()
+        for prepared in prepared_list:
+            block_hash = prepared["hash"]
+            is_new = block_hash in created and block_hash not in seen_new
+            if is_new:
+                seen_new.add(block_hash)
+            results.append((ids[block_hash], is_new))
+        return results
+
     def store_block(self, data: bytes) -> Tuple[Block, bool]:
         """Legacy synchronous storage."""
         prepared = self.prepare_block(data)
@@ -125,13 +304,12 @@ class BlockManager:
         Read and decrypt a block's data. 
         Safe to run in a thread pool (CPU and IO intensive).
         """
-        full_path = self.blocks_dir / block.relative_path
-        
-        if not full_path.exists():
-            raise FileNotFoundError(f"Block file not found: {block.relative_path}")
+        full_path = self.blocks_dir.joinpath(block.relative_path)
         
-        with open(full_path, "rb") as f:
-            encrypted_data = f.read()
+        try:
+            encrypted_data = _read_block_raw(full_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Block file not found: {block.relative_path}") from None
         
         # Derive key and decrypt
         file_key = derive_file_key(self.master_key, block.salt)
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Tuple, Optional, Callable
 from src.core.i18n import _
 
+import itertools
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -319,52 +320,45 @@ class FileImporter:
             # Update progress tracker
             self.progress_tracker.update(block_order * BLOCK_SIZE, f"Resuming: {file_path.name}")
         
-        # Use ThreadPoolExecutor for CPU/IO intensive preparation
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            # Use an iterator to read the file lazily
-            block_iterator = iter_file_blocks(file_path, BLOCK_SIZE)
+        # Use an iterator to read the file lazily
+        block_iterator = iter_file_blocks(file_path, BLOCK_SIZE)
+        
+        # Skip already processed blocks
+        for _ in range(block_order):
+            next(block_iterator, None)
+        
+        while True:
+            if self.is_cancelled():
+                raise OperationCancelled("Import cancelled by user")
             
-            # Skip already processed blocks
-            for _ in range(block_order):
-                next(block_iterator, None)
+            # Hash/encrypt a batch on the shared CPU pool (DB stays single-writer)
+            prepared_batch = list(self.block_manager.prepare_blocks_parallel(
+                itertools.islice(block_iterator, BATCH_SIZE)
+            ))
             
-            while True:
-                if self.is_cancelled():
-                    raise OperationCancelled("Import cancelled by user")
-                    
-                # Collect a batch of futures
-                futures = []
-                for _ in range(BATCH_SIZE):
-                    try:
-                        block_data = next(block_iterator)
-                        future = executor.submit(self.block_manager.prepare_block, block_data)
-                        futures.append(future)
-                    except StopIteration:
-                        break
+            if not prepared_batch:
+                break
+            
+            if self.is_cancelled():
+                raise OperationCancelled("Import cancelled by user")
+            
+            db = get_repository_database(self.repository.path)
+            with db.transaction():
+                stored = self.block_manager.store_prepared_blocks(prepared_batch)
                 
-                if not futures:
-                    break
-                    
-                # Process and commit the batch
-                db = get_repository_database(self.repository.path)
-                with db.transaction():
-                    batch_mappings = []
-                    for future in futures:
-                        if self.is_cancelled():
-                            raise OperationCancelled("Import cancelled by user")
-                            
-                        prepared = future.result()
-                        block, _ = self.block_manager.store_prepared_block(prepared)
-                        batch_mappings.append((virtual_file.id, block.id, block_order))
-                        block_order += 1
-                        
-                        self.progress_tracker.update(
-                            prepared["original_size"], 
-                            f"Encrypting: {file_path.name}"
-                        )
-                    
-                    # Commit this batch immediately for breakpoint support
-                    FileBlockMapping.create_batch(batch_mappings, self.repository.path)
+                batch_mappings = []
+                for block_id, _ in stored:
+                    batch_mappings.append((virtual_file.id, block_id, block_order))
+                    block_order += 1
+                
+                # Commit this batch immediately for breakpoint support
+                FileBlockMapping.create_batch(batch_mappings, self.repository.path)
+            
+            for prepared in prepared_batch:
+                self.progress_tracker.update(
+                    prepared["original_size"],
+                    f"Encrypting: {file_path.name}"
+                )
         
         return virtual_file
     
@@ -466,14 +460,9 @@ class FileImporter:
     
     def _calculate_folder_size(self, folder_path: Path) -> int:
         """Calculate total size of folder contents."""
-        total = 0
-        try:
-            for item in folder_path.rglob("*"):
-                if item.is_file():
-                    total += get_file_size(item)
-        except Exception:
-            pass
-        return total
+        # scandir entries carry their stat result, so each file costs one
+        # syscall instead of rglob's is_file() + stat() pair
+        return fast_scandir(folder_path)
 
     @staticmethod
     def calculate_total_import_size(file_paths: list[Path], progress_callback: Optional[Callable] = None) -> int:
@@ -9,6 +9,7 @@ import shutil
 import json
 import ctypes
 import platform
+import sqlite3
 from pathlib import Path
 from typing import List, Optional, Tuple
 from src.core.i18n import _
@@ -19,7 +20,7 @@ from src.database.database import (
     get_global_database, RepositoryDatabase
 )
 from src.core.config import get_config
-from src.core.crypto import compute_key_hash
+from src.core.crypto import compute_key_hash, verify_key_hash
 
 
 def get_disk_free_space(path: str) -> int:
@@ -258,8 +259,7 @@ def import_repository(config_path: str, master_key: bytes) -> tuple:
     if "master_key_hash" not in config:
         raise ValueError(_("error_no_key_hash"))
     
-    current_hash = compute_key_hash(master_key)
-    if config["master_key_hash"] != current_hash:
+    if not verify_key_hash(master_key, config["master_key_hash"]):
         raise ValueError(_("error_key_mismatch"))
     
     # Check if path already exists in our database
@@ -455,6 +455,34 @@ def can_store_file(repo: Repository, file_size: int) -> bool:
     return file_size <= available
 
 
+def get_repository_usage(repo_path: str) -> int:
+    """
+    Get the bytes stored in a repository without activating it.
+    
+    Opens the repository database read-only on a private connection, so it
+    is safe to call from worker threads and leaves the current repository
+    database untouched.
+    
+    Args:
+        repo_path: Repository path
+    
+    Returns:
+        Total size of stored blocks in bytes
+    
+    Raises:
+        sqlite3.Error: If the database cannot be read
+    """
+    db_path = Path(repo_path) / RepositoryDatabase.VAULT_DIR / RepositoryDatabase.DB_NAME
+    if not db_path.exists():
+        return 0
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()
+        return row[0]
+    finally:
+        conn.close()
+
+
 def get_repository_stats(repo: Repository) -> dict:
     """
     Get repository statistics.
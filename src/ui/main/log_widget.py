@@ -3,9 +3,12 @@ Secure Vault - Log Widget
 Real-time log display with color coding.
 """
 
+import html
+import threading
+
 from PyQt6.QtWidgets import QPlainTextEdit
-from PyQt6.QtCore import pyqtSlot, pyqtSignal
-from PyQt6.QtGui import QTextCharFormat, QColor, QFont
+from PyQt6.QtCore import pyqtSlot, pyqtSignal, QTimer
+from PyQt6.QtGui import QFont, QTextOption
 
 from src.ui.styles import get_log_colors
 from src.core.i18n import _
@@ -14,16 +17,25 @@ from src.core.i18n import _
 class LogWidget(QPlainTextEdit):
     """Widget for displaying operation logs."""
     
-    # Signal to update UI from any thread safely
-    log_added = pyqtSignal(str, str, str)
+    FLUSH_INTERVAL_MS = 50  # Log lines arriving within this window are drawn together
+    
+    # Signal to update UI from any thread safely (emitted once per batch)
+    flush_requested = pyqtSignal()
     
     def __init__(self, dark_mode: bool = True, parent=None):
         super().__init__(parent)
         self._dark_mode = dark_mode
+        self._pending: list = []  # (timestamp, level, message) not yet shown
+        self._pending_lock = threading.Lock()
         self._setup_ui()
         
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        
         # Connect signal to slot
-        self.log_added.connect(self._on_log_added)
+        self.flush_requested.connect(self._schedule_flush)
     
     def contextMenuEvent(self, event):
         """Show context menu on right click."""
@@ -40,6 +52,15 @@ class LogWidget(QPlainTextEdit):
         self.setReadOnly(True)
         self.setMaximumBlockCount(1000)  # Limit lines
         
+        # Log lines are short; skipping word-wrap keeps each append from
+        # re-laying out the paragraph (long lines scroll horizontally)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setCenterOnScroll(False)
+        doc = self.document()
+        option = doc.defaultTextOption()
+        option.setWrapMode(QTextOption.WrapMode.NoWrap)
+        doc.setDefaultTextOption(option)
+        
         # Font
         font = QFont("Cascadia Code", 10)
         font.setStyleHint(QFont.StyleHint.Monospace)
@@ -56,32 +77,58 @@ class LogWidget(QPlainTextEdit):
     def add_log(self, timestamp: str, level: str, message: str):
         """
         Add a log entry (Thread-safe public method).
-        Emits signal to handle UI update on main thread.
+        Queues the line; the UI thread draws queued lines in batches.
+        """
+        with self._pending_lock:
+            self._pending.append((timestamp, level, message))
+            first = len(self._pending) == 1
+        if first:
+            self.flush_requested.emit()
+
+    def add_logs(self, records: list):
         """
-        self.log_added.emit(timestamp, level, message)
+        Add several (timestamp, level, message) entries at once (Thread-safe).
+        Used as the logger's batch callback: one lock and at most one signal
+        per burst instead of per line.
+        """
+        if not records:
+            return
+        with self._pending_lock:
+            first = not self._pending
+            self._pending.extend(records)
+        if first:
+            self.flush_requested.emit()
+
+    @pyqtSlot()
+    def _schedule_flush(self):
+        """Start the batch timer (Main thread only)."""
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
 
-    @pyqtSlot(str, str, str)
-    def _on_log_added(self, timestamp: str, level: str, message: str):
+    @pyqtSlot()
+    def _flush(self):
         """
         Actually update the UI (Main thread only).
         """
-        colors = get_log_colors(self._dark_mode)
-        color = colors.get(level, colors["INFO"])
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
         
-        # Format line
-        line = f"[{timestamp}] [{level}] {message}"
-        
-        # Use appendPlainText which is thread-safe and doesn't cause cursor issues
-        self.appendPlainText(line)
-        
-        # Apply color to last block
-        cursor = self.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
-        cursor.movePosition(cursor.MoveOperation.StartOfBlock, cursor.MoveMode.KeepAnchor)
+        colors = get_log_colors(self._dark_mode)
+        default_color = colors["INFO"]
         
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor(color))
-        cursor.mergeCharFormat(fmt)
+        # One repaint for the whole batch instead of one per line
+        self.setUpdatesEnabled(False)
+        try:
+            for timestamp, level, message in batch:
+                color = colors.get(level, default_color)
+                line = html.escape(f"[{timestamp}] [{level}] {message}")
+                self.appendHtml(
+                    f'<span style="color:{color}; white-space:pre">{line}</span>'
+                )
+        finally:
+            self.setUpdatesEnabled(True)
     
     def add_info(self, message: str):
         """Add an info log entry."""
@@ -33,7 +33,7 @@ from src.utils.logger import get_logger
 from src.utils.file_utils import get_unique_filename
 
 from src.ui.styles import get_stylesheet
-from src.ui.window_utils import update_all_windows_theme
+from src.ui.window_utils import update_all_windows_theme, watch_window
 from src.ui.main.file_tree import FileTreeView, FileTreeModel
 from src.ui.main.context_menu import FileContextMenu
 from src.ui.main.progress_widget import ProgressWidget
@@ -74,6 +74,7 @@ class MainWindow(QMainWindow):
     
     def __init__(self, master_key: bytes, repository: Repository, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.master_key = master_key
         self.repository = repository
         self.config = get_config()
@@ -103,6 +104,22 @@ class MainWindow(QMainWindow):
         self._persistence_timer = QTimer(self)
         self._persistence_timer.timeout.connect(self._save_progress_heartbeat)
         self._persistence_timer.start(3000)
+        
+        # Reclaim free database pages in small steps while no task is running
+        self._vacuum_timer = QTimer(self)
+        self._vacuum_timer.timeout.connect(self._vacuum_when_idle)
+        self._vacuum_timer.start(60000)
+
+    def _vacuum_when_idle(self):
+        """Release free pages left behind by deletions (incremental auto-vacuum)."""
+        if self._worker and self._worker.isRunning():
+            return
+        try:
+            db = get_repository_database(self.repository.path)
+            if db is not None:
+                db.vacuum_incremental()
+        except Exception:
+            pass
 
     def _save_progress_heartbeat(self):
         """Periodically flush current operation progress to DB to ensure persistence."""
@@ -251,7 +268,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.log_widget)
         
         # Connect logger to log widget
-        self.logger.add_callback(self.log_widget.add_log)
+        self.logger.add_batch_callback(self.log_widget.add_logs)
     
     def _create_title_bar(self, parent_layout):
         """Create custom title bar with controls."""
@@ -536,8 +553,7 @@ class MainWindow(QMainWindow):
         """Show PIN change dialog."""
         from src.ui.setup.pin_change import PinChangeDialog
         
-        dialog = PinChangeDialog(self)
-        dialog.setStyleSheet(get_stylesheet(self.config.dark_mode))
+        dialog = PinChangeDialog(self)  # Inherits the window's stylesheet
         
         if dialog.exec() == PinChangeDialog.DialogCode.Accepted:
             self.logger.operation(_("log_security"), _("log_pin_changed"))
@@ -565,8 +581,7 @@ class MainWindow(QMainWindow):
         current_repo_id = self.repository.id
         
         # Pass master_key correctly
-        dialog = RepositoryManagerDialog(self.master_key, self)
-        dialog.setStyleSheet(get_stylesheet(self.config.dark_mode))
+        dialog = RepositoryManagerDialog(self.master_key, self)  # Inherits the window's stylesheet
         
         selected_repo_id = None
         
@@ -1589,7 +1604,7 @@ class MainWindow(QMainWindow):
         """Handle window close event with graceful shutdown."""
         # Check if we are restarting (bypass confirmation)
         if getattr(self, "_is_restarting", False):
-            self.logger.remove_callback(self.log_widget.add_log)
+            self.logger.remove_batch_callback(self.log_widget.add_logs)
             event.accept()
             return
             
@@ -1624,5 +1639,5 @@ class MainWindow(QMainWindow):
                 return
         
         self.logger.operation(_("log_exit"), _("log_app_closed"))
-        self.logger.remove_callback(self.log_widget.add_log)
+        self.logger.remove_batch_callback(self.log_widget.add_logs)
         event.accept()
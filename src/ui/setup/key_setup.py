@@ -3,15 +3,24 @@ Secure Vault - Key Setup Dialog
 Master key generation (manual or random).
 """
 
+import re
+
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QRadioButton, QButtonGroup, QTextEdit,
-    QMessageBox, QFrame
+    QMessageBox, QFrame, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer
 
 from src.core.crypto import generate_master_key
 from src.core.i18n import _
+from src.ui.window_utils import watch_window
+
+# A 32-byte master key written as hex
+_HEX64_RE = re.compile(r"[0-9a-fA-F]{64}")
+
+# Keystrokes (or a paste) closer together than this are validated once
+VALIDATE_DELAY_MS = 60
 
 
 class KeySetupDialog(QDialog):
@@ -21,6 +30,7 @@ class KeySetupDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.setWindowTitle(_("key_setup_title"))
         self.setFixedSize(500, 450)
         self.setWindowFlags(
@@ -28,6 +38,14 @@ class KeySetupDialog(QDialog):
             Qt.WindowType.WindowCloseButtonHint
         )
         self._generated_key: bytes = None
+        self._generated_hex: str = None  # Hex form of _generated_key
+        # Last manual input seen and whether it is a well-formed key
+        self._last_manual_text: str = None
+        self._last_manual_valid = False
+        self._validate_timer = QTimer(self)
+        self._validate_timer.setSingleShot(True)
+        self._validate_timer.setInterval(VALIDATE_DELAY_MS)
+        self._validate_timer.timeout.connect(self._validate_manual_key)
         self._setup_ui()
     
     def _setup_ui(self):
@@ -97,25 +115,9 @@ class KeySetupDialog(QDialog):
         
         layout.addWidget(self.random_frame)
         
-        # Manual key input
-        self.manual_frame = QFrame()
-        self.manual_frame.setProperty("class", "card")
-        self.manual_frame.setVisible(False)
-        manual_layout = QVBoxLayout(self.manual_frame)
-        
-        manual_label = QLabel(_("label_manual_key"))
-        manual_layout.addWidget(manual_label)
-        
-        self.manual_input = QLineEdit()
-        self.manual_input.setPlaceholderText(_("placeholder_hex_64"))
-        self.manual_input.textChanged.connect(self._validate_manual_key)
-        manual_layout.addWidget(self.manual_input)
-        
-        self.manual_error = QLabel("")
-        self.manual_error.setStyleSheet("color: #f14c4c;")
-        manual_layout.addWidget(self.manual_error)
-        
-        layout.addWidget(self.manual_frame)
+        # Manual key input is built on first switch to manual mode
+        self.manual_frame: QFrame = None
+        self._manual_frame_index = layout.count()
         
         # Warning
         warning = QLabel(_("label_backup_warning"))
@@ -139,23 +141,53 @@ class KeySetupDialog(QDialog):
         # Generate initial key
         self._generate_key()
     
+    def _ensure_manual_frame(self):
+        """Build the manual key card in its reserved layout slot."""
+        if self.manual_frame is not None:
+            return
+        
+        self.manual_frame = QFrame()
+        self.manual_frame.setProperty("class", "card")
+        self.manual_frame.setVisible(False)
+        manual_layout = QVBoxLayout(self.manual_frame)
+        
+        manual_label = QLabel(_("label_manual_key"))
+        manual_layout.addWidget(manual_label)
+        
+        self.manual_input = QLineEdit()
+        self.manual_input.setPlaceholderText(_("placeholder_hex_64"))
+        self.manual_input.textChanged.connect(self._validate_timer.start)
+        manual_layout.addWidget(self.manual_input)
+        
+        self.manual_error = QLabel("")
+        self.manual_error.setStyleSheet("color: #f14c4c;")
+        manual_layout.addWidget(self.manual_error)
+        
+        self.layout().insertWidget(self._manual_frame_index, self.manual_frame)
+    
+    @pyqtSlot(bool)
     def _on_mode_changed(self, is_random: bool):
         """Handle mode toggle."""
+        if not is_random:
+            self._ensure_manual_frame()
         self.random_frame.setVisible(is_random)
-        self.manual_frame.setVisible(not is_random)
+        if self.manual_frame is not None:
+            self.manual_frame.setVisible(not is_random)
         self._validate_confirm_button()
     
+    @pyqtSlot()
     def _generate_key(self):
         """Generate a new random key."""
         self._generated_key = generate_master_key()
-        self.key_display.setText(self._generated_key.hex())
+        self._generated_hex = self._generated_key.hex()
+        self.key_display.setText(self._generated_hex)
         self._validate_confirm_button()
     
+    @pyqtSlot()
     def _copy_key(self):
         """Copy key to clipboard."""
-        from PyQt6.QtWidgets import QApplication
         clipboard = QApplication.clipboard()
-        clipboard.setText(self._generated_key.hex())
+        clipboard.setText(self._generated_hex)
         
         # Show feedback
         QMessageBox.information(
@@ -164,25 +196,25 @@ class KeySetupDialog(QDialog):
             _("msg_key_copied_msg")
         )
     
+    @pyqtSlot()
     def _validate_manual_key(self):
         """Validate manual key input."""
         text = self.manual_input.text().strip()
-        self.manual_error.setText("")
-        
-        if not text:
-            return
-        
-        # Check length
-        if len(text) != 64:
-            self.manual_error.setText(_("error_hex_length", count=len(text)))
+        if text == self._last_manual_text:
             return
+        self._last_manual_text = text
+        self._last_manual_valid = False
+        self.manual_error.setText("")
         
-        # Check hex
-        try:
-            bytes.fromhex(text)
-        except ValueError:
-            self.manual_error.setText(_("error_hex_invalid"))
-            return
+        if text:
+            if len(text) != 64:
+                # Check length
+                self.manual_error.setText(_("error_hex_length", count=len(text)))
+            elif _HEX64_RE.fullmatch(text) is None:
+                # Check hex
+                self.manual_error.setText(_("error_hex_invalid"))
+            else:
+                self._last_manual_valid = True
         
         self._validate_confirm_button()
     
@@ -191,19 +223,25 @@ class KeySetupDialog(QDialog):
         if self.random_radio.isChecked():
             self.confirm_btn.setEnabled(self._generated_key is not None)
         else:
-            text = self.manual_input.text().strip()
-            try:
-                is_valid = len(text) == 64 and bytes.fromhex(text)
-                self.confirm_btn.setEnabled(is_valid)
-            except ValueError:
-                self.confirm_btn.setEnabled(False)
+            self.confirm_btn.setEnabled(self._last_manual_valid)
     
+    @pyqtSlot()
     def _on_confirm(self):
         """Handle confirm button click."""
         if self.random_radio.isChecked():
             key = self._generated_key
         else:
-            key = bytes.fromhex(self.manual_input.text().strip())
+            if self._validate_timer.isActive():
+                # Input changed since the last check: validate before accepting
+                self._validate_timer.stop()
+                self._validate_manual_key()
+                if not self._last_manual_valid:
+                    return
+            try:
+                key = bytes.fromhex(self.manual_input.text().strip())
+            except ValueError:
+                self.manual_error.setText(_("error_hex_invalid"))
+                return
         
         # Confirmation dialog
         reply = QMessageBox.question(
@@ -7,13 +7,57 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QRunnable, QThreadPool
 
-from src.core.config import get_config
+from src.core.config import get_config, ConfigError
 from src.core.crypto import (
-    decrypt_master_key, encrypt_master_key, verify_key_hash, CryptoError
+    decrypt_master_key, encrypt_master_key, calibrate_kdf_params,
+    verify_key_hash, CryptoError, KeyDerivationError
 )
 from src.core.i18n import _
+from src.ui.setup.pin_setup import KeyDerivationSignals
+from src.ui.window_utils import watch_window
+
+
+class PinChangeTask(QRunnable):
+    """
+    Re-wraps the master key under a new PIN off the GUI thread.
+    
+    Unwrapping with the current PIN, calibrating Argon2id and wrapping with
+    the new PIN each run the KDF, together taking a second or more.
+    Emits (master_key, opslimit, memlimit, encrypted_key, salt, nonce) or
+    the raised exception; CryptoError means the current PIN is wrong.
+    """
+    
+    def __init__(self, current_pin: str, new_pin: str, stored: tuple):
+        super().__init__()
+        self.signals = KeyDerivationSignals()
+        self._current_pin = current_pin
+        self._new_pin = new_pin
+        # (encrypted_key, salt, nonce, opslimit, memlimit, key_hash), read on the GUI thread
+        self._stored = stored
+    
+    def run(self):
+        try:
+            result = self._change()
+        except Exception as e:
+            result = e
+        self.signals.finished.emit(result)
+    
+    def _change(self) -> tuple:
+        encrypted_key, salt, nonce, opslimit, memlimit, key_hash = self._stored
+        master_key = decrypt_master_key(
+            encrypted_key, self._current_pin, salt, nonce, opslimit, memlimit
+        )
+        if not verify_key_hash(master_key, key_hash):
+            raise CryptoError("Master key hash mismatch")
+        
+        # Encrypt master key with new PIN, re-tuning Argon2id for this machine
+        opslimit, memlimit = calibrate_kdf_params()
+        encrypted_key, salt, nonce = encrypt_master_key(
+            master_key, self._new_pin, opslimit, memlimit
+        )
+        return master_key, opslimit, memlimit, encrypted_key, salt, nonce
 
 
 class PinChangeDialog(QDialog):
@@ -23,6 +67,7 @@ class PinChangeDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.setWindowTitle(_("pin_change_title"))
         self.setFixedSize(420, 380)
         self.setWindowFlags(
@@ -30,6 +75,8 @@ class PinChangeDialog(QDialog):
             Qt.WindowType.WindowCloseButtonHint
         )
         self._master_key: bytes = None
+        self._task: PinChangeTask = None  # Kept alive until the pool is done with it
+        self._busy = False
         self._setup_ui()
     
     def _setup_ui(self):
@@ -91,9 +138,9 @@ class PinChangeDialog(QDialog):
         btn_layout = QHBoxLayout()
         btn_layout.addStretch()
         
-        cancel_btn = QPushButton(_("btn_cancel"))
-        cancel_btn.clicked.connect(self.reject)
-        btn_layout.addWidget(cancel_btn)
+        self.cancel_btn = QPushButton(_("btn_cancel"))
+        self.cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(self.cancel_btn)
         
         self.change_btn = QPushButton(_("btn_change"))
         self.change_btn.setProperty("class", "primary")
@@ -102,6 +149,7 @@ class PinChangeDialog(QDialog):
         
         layout.addLayout(btn_layout)
     
+    @pyqtSlot()
     def _on_change(self):
         """Handle change button click."""
         current_pin = self.current_input.text()
@@ -127,33 +175,58 @@ class PinChangeDialog(QDialog):
             self.error_label.setText(_("error_new_pin_same_as_current"))
             return
         
-        # Verify current PIN
+        # Verify current PIN and re-wrap the key in the background
         config = get_config()
         try:
-            decrypted_key = decrypt_master_key(
+            stored = (
                 config.encrypted_master_key,
-                current_pin,
                 config.master_key_salt,
-                config.master_key_nonce
+                config.master_key_nonce,
+                config.kdf_opslimit,
+                config.kdf_memlimit,
+                config.master_key_hash
+            )
+        except ConfigError as e:
+            QMessageBox.critical(
+                self,
+                _("label_error"),
+                _("error_config_corrupted", error=str(e))
             )
-            
-            if not verify_key_hash(decrypted_key, config.master_key_hash):
+            return
+        self._set_busy(True)
+        self._task = PinChangeTask(current_pin, new_pin, stored)
+        self._task.setAutoDelete(False)
+        self._task.signals.finished.connect(self._on_change_finished)
+        QThreadPool.globalInstance().start(self._task)
+    
+    @pyqtSlot(object)
+    def _on_change_finished(self, result):
+        """Save the re-wrapped key once PinChangeTask is done."""
+        self._set_busy(False)
+        if isinstance(result, Exception):
+            # KeyDerivationError subclasses CryptoError, so test it first
+            if isinstance(result, KeyDerivationError):
+                self.error_label.setText(_("error_key_derivation"))
+            elif isinstance(result, CryptoError):
                 self.error_label.setText(_("error_pin_invalid"))
-                return
-            
-            self._master_key = decrypted_key
-            
-        except CryptoError:
-            self.error_label.setText(_("error_pin_invalid"))
+            else:
+                QMessageBox.critical(
+                    self,
+                    _("label_error"),
+                    _("error_pin_change_failed", error=str(result))
+                )
             return
         
-        # Encrypt master key with new PIN
-        encrypted_key, salt, nonce = encrypt_master_key(self._master_key, new_pin)
+        self._master_key, opslimit, memlimit, encrypted_key, salt, nonce = result
         
         # Save new encrypted key
-        config.encrypted_master_key = encrypted_key
-        config.master_key_salt = salt
-        config.master_key_nonce = nonce
+        config = get_config()
+        with config.batch():
+            config.kdf_opslimit = opslimit
+            config.kdf_memlimit = memlimit
+            config.encrypted_master_key = encrypted_key
+            config.master_key_salt = salt
+            config.master_key_nonce = nonce
         
         # Show success message
         QMessageBox.information(
@@ -164,3 +237,19 @@ class PinChangeDialog(QDialog):
         
         self.pin_changed.emit()
         self.accept()
+    
+    def _set_busy(self, busy: bool):
+        """Lock the form while the key is being re-wrapped."""
+        self._busy = busy
+        for widget in (
+            self.current_input, self.new_input, self.confirm_input,
+            self.change_btn, self.cancel_btn
+        ):
+            widget.setEnabled(not busy)
+        self.change_btn.setText(_("btn_changing") if busy else _("btn_change"))
+    
+    def reject(self):
+        """Ignore close requests until an in-flight change has been saved."""
+        if self._busy:
+            return
+        super().reject()
@@ -3,13 +3,80 @@ Secure Vault - PIN Setup Dialog
 First-time PIN configuration with confirmation.
 """
 
+import string
+
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QProgressBar
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QObject, QRunnable, QTimer
 
+from src.core.crypto import (
+    derive_key_from_pin, calibrate_kdf_params, encrypt_master_key, compute_key_hash
+)
 from src.core.i18n import _
+from src.ui.window_utils import watch_window
+
+# Character classes for PIN strength scoring
+_LOWER = frozenset(string.ascii_lowercase)
+_UPPER = frozenset(string.ascii_uppercase)
+_DIGIT = frozenset(string.digits)
+_ALNUM = _LOWER | _UPPER | _DIGIT
+
+# Keystrokes closer together than this are validated once
+VALIDATE_DELAY_MS = 60
+
+
+class KeyDerivationSignals(QObject):
+    """Signals for KeyDerivationTask (QRunnable cannot emit on its own)."""
+    
+    finished = pyqtSignal(object)  # Derived key bytes, or the raised exception
+
+
+class KeyDerivationTask(QRunnable):
+    """Runs Argon2id off the GUI thread so dialogs keep painting."""
+    
+    def __init__(self, pin: str, salt: bytes, opslimit=None, memlimit=None):
+        super().__init__()
+        self.signals = KeyDerivationSignals()
+        self._args = (pin, salt, opslimit, memlimit)
+    
+    def run(self):
+        try:
+            result = derive_key_from_pin(*self._args)
+        except Exception as e:
+            result = e
+        self.signals.finished.emit(result)
+
+
+class MasterKeyWrapTask(QRunnable):
+    """
+    Wraps a new master key under the PIN off the GUI thread (first run).
+    
+    Calibrating Argon2id and wrapping the key each run the KDF, together
+    taking a second or more. Emits (opslimit, memlimit, encrypted_key,
+    salt, nonce, key_hash) or the raised exception.
+    """
+    
+    def __init__(self, master_key: bytes, pin: str):
+        super().__init__()
+        self.signals = KeyDerivationSignals()
+        self._master_key = master_key
+        self._pin = pin
+    
+    def run(self):
+        try:
+            opslimit, memlimit = calibrate_kdf_params()
+            encrypted_key, salt, nonce = encrypt_master_key(
+                self._master_key, self._pin, opslimit, memlimit
+            )
+            result = (
+                opslimit, memlimit, encrypted_key, salt, nonce,
+                compute_key_hash(self._master_key)
+            )
+        except Exception as e:
+            result = e
+        self.signals.finished.emit(result)
 
 
 class PinSetupDialog(QDialog):
@@ -17,14 +84,25 @@ class PinSetupDialog(QDialog):
     
     pin_configured = pyqtSignal(str)  # Emits the PIN when configured
     
+    # Strength bar colors by band (weak / fair / strong)
+    _QSS_RED = "QProgressBar::chunk { background-color: #f14c4c; }"
+    _QSS_YELLOW = "QProgressBar::chunk { background-color: #dcdcaa; }"
+    _QSS_GREEN = "QProgressBar::chunk { background-color: #4ec9b0; }"
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.setWindowTitle(_("pin_setup_title"))
         self.setFixedSize(450, 350)
         self.setWindowFlags(
             Qt.WindowType.Window |
             Qt.WindowType.WindowCloseButtonHint
         )
+        self._validate_timer = QTimer(self)
+        self._validate_timer.setSingleShot(True)
+        self._validate_timer.setInterval(VALIDATE_DELAY_MS)
+        self._validate_timer.timeout.connect(self._on_pin_changed)
+        self._strength_qss: str = None  # Stylesheet currently on strength_bar
         self._setup_ui()
     
     def _setup_ui(self):
@@ -58,7 +136,7 @@ class PinSetupDialog(QDialog):
         self.pin_input = QLineEdit()
         self.pin_input.setEchoMode(QLineEdit.EchoMode.Password)
         self.pin_input.setPlaceholderText(_("placeholder_enter_pin"))
-        self.pin_input.textChanged.connect(self._on_pin_changed)
+        self.pin_input.textChanged.connect(self._validate_timer.start)
         layout.addWidget(self.pin_input)
         
         # Confirm PIN input
@@ -68,7 +146,7 @@ class PinSetupDialog(QDialog):
         self.confirm_input = QLineEdit()
         self.confirm_input.setEchoMode(QLineEdit.EchoMode.Password)
         self.confirm_input.setPlaceholderText(_("placeholder_confirm_pin"))
-        self.confirm_input.textChanged.connect(self._on_pin_changed)
+        self.confirm_input.textChanged.connect(self._validate_timer.start)
         layout.addWidget(self.confirm_input)
         
         # Strength indicator
@@ -119,16 +197,26 @@ class PinSetupDialog(QDialog):
             score += 15
         
         # Character variety
-        has_lower = any(c.islower() for c in pin)
-        has_upper = any(c.isupper() for c in pin)
-        has_digit = any(c.isdigit() for c in pin)
-        has_special = any(not c.isalnum() for c in pin)
+        chars = set(pin)
+        if pin.isascii():
+            # Fast path: for ASCII the set tests match str.islower() etc.
+            has_lower = not chars.isdisjoint(_LOWER)
+            has_upper = not chars.isdisjoint(_UPPER)
+            has_digit = not chars.isdisjoint(_DIGIT)
+            has_special = not chars <= _ALNUM
+        else:
+            # Unicode rules, so e.g. "é" counts as lowercase and CJK as letters
+            has_lower = any(c.islower() for c in chars)
+            has_upper = any(c.isupper() for c in chars)
+            has_digit = any(c.isdigit() for c in chars)
+            has_special = any(not c.isalnum() for c in chars)
         
         variety = sum([has_lower, has_upper, has_digit, has_special])
         score += variety * 10
         
         return min(score, 100)
     
+    @pyqtSlot()
     def _on_pin_changed(self):
         """Handle PIN input changes."""
         pin = self.pin_input.text()
@@ -138,19 +226,16 @@ class PinSetupDialog(QDialog):
         strength = self._calculate_strength(pin)
         self.strength_bar.setValue(strength)
         
-        # Update strength bar color
+        # Update strength bar color (restyling re-parses QSS, so only on band change)
         if strength < 30:
-            self.strength_bar.setStyleSheet(
-                "QProgressBar::chunk { background-color: #f14c4c; }"
-            )
+            qss = self._QSS_RED
         elif strength < 60:
-            self.strength_bar.setStyleSheet(
-                "QProgressBar::chunk { background-color: #dcdcaa; }"
-            )
+            qss = self._QSS_YELLOW
         else:
-            self.strength_bar.setStyleSheet(
-                "QProgressBar::chunk { background-color: #4ec9b0; }"
-            )
+            qss = self._QSS_GREEN
+        if qss is not self._strength_qss:
+            self._strength_qss = qss
+            self.strength_bar.setStyleSheet(qss)
         
         # Validate
         self.error_label.setText("")
@@ -167,8 +252,15 @@ class PinSetupDialog(QDialog):
         
         self.confirm_btn.setEnabled(valid)
     
+    @pyqtSlot()
     def _on_confirm(self):
         """Handle confirm button click."""
+        if self._validate_timer.isActive():
+            # Input changed since the last check: validate before accepting
+            self._validate_timer.stop()
+            self._on_pin_changed()
+            if not self.confirm_btn.isEnabled():
+                return
         pin = self.pin_input.text()
         self.pin_configured.emit(pin)
         self.accept()
@@ -181,6 +273,7 @@ class PinVerifyDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.setWindowTitle(_("pin_verify_title"))
         self.setFixedSize(400, 250)
         self.setWindowFlags(
@@ -240,6 +333,7 @@ class PinVerifyDialog(QDialog):
         
         layout.addLayout(btn_layout)
     
+    @pyqtSlot()
     def _on_unlock(self):
         """Handle unlock button click."""
         pin = self.pin_input.text()
@@ -249,8 +343,17 @@ class PinVerifyDialog(QDialog):
         
         self.pin_verified.emit(pin)
     
+    def set_busy(self, busy: bool):
+        """Lock input while the PIN is being checked in the background."""
+        self.pin_input.setEnabled(not busy)
+        self.unlock_btn.setEnabled(not busy)
+        self.unlock_btn.setText(_("btn_unlocking") if busy else _("btn_unlock"))
+        if busy:
+            self.error_label.setText("")
+    
     def show_error(self, message: str):
         """Show error message."""
+        self.set_busy(False)
         self.error_label.setText(message)
         self.pin_input.clear()
         self.pin_input.setFocus()
@@ -3,25 +3,186 @@ Secure Vault - Repository Manager Dialog
 Repository creation, selection, and management.
 """
 
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QWidget, QLabel, QLineEdit,
+    QPushButton, QTableView, QHeaderView,
     QFileDialog, QMessageBox, QSpinBox, QComboBox,
     QAbstractItemView, QInputDialog
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, pyqtSlot, QAbstractTableModel, QModelIndex,
+    QObject, QRunnable, QThreadPool, QTimer
+)
 
 from src.core.config import get_config
 from src.core.i18n import _
 from src.database.database import get_global_database, RepositoryDatabase
 from src.repository.repository import (
     list_repositories, create_repository, delete_repository,
-    get_disk_total_space, get_repository_stats, set_active_repository,
+    get_disk_total_space, get_repository_usage, set_active_repository,
     import_repository, rename_repository, get_repository, save_repository_config
 )
 from src.core.hash_utils import format_size
 from src.database.models import Repository
+from src.ui.window_utils import watch_window
+
+
+class RepoUsageSignals(QObject):
+    """Signals for RepoUsageTask."""
+    
+    finished = pyqtSignal(int, object)  # Repository ID, used bytes (None on error)
+
+
+class RepoUsageTask(QRunnable):
+    """Reads a repository's used capacity on the thread pool."""
+    
+    def __init__(self, repo_id: int, repo_path: str):
+        super().__init__()
+        self.signals = RepoUsageSignals()
+        self._repo_id = repo_id
+        self._repo_path = repo_path
+    
+    def run(self):
+        try:
+            used = get_repository_usage(self._repo_path)
+        except Exception:
+            # Drive missing or database unreadable
+            used = None
+        self.signals.finished.emit(self._repo_id, used)
+
+
+@lru_cache(maxsize=128)
+def _resolve(path: str) -> str:
+    """Resolve a registered repository path (cached; cleared on delete)."""
+    return str(Path(path).resolve())
+
+
+# Total size per volume (drive letter on Windows, device ID elsewhere);
+# cleared whenever a CreateRepositoryDialog opens so swapped media is seen
+_disk_total_cache: Dict[object, int] = {}
+
+
+def _volume_total_space(path: str) -> int:
+    """Get the total size of the volume holding an existing path, memoized."""
+    key = None
+    if os.name == "nt":
+        key = os.path.splitdrive(os.path.abspath(path))[0].upper() or None
+    else:
+        try:
+            key = os.stat(path).st_dev
+        except OSError:
+            pass
+    if key is None:
+        return get_disk_total_space(path)
+    
+    total = _disk_total_cache.get(key)
+    if total is None:
+        total = get_disk_total_space(path)
+        if total:
+            _disk_total_cache[key] = total
+    return total
+
+
+# Bytes per capacity unit offered in CreateRepositoryDialog
+_CAPACITY_MULTIPLIERS = {
+    "MB": 1 << 20,
+    "GB": 1 << 30,
+    "TB": 1 << 40,
+}
+
+# Used-capacity cell text while the size is still being read
+_USED_PENDING = "…"
+
+
+class RepoTableModel(QAbstractTableModel):
+    """Table model for the repository list (one row per repository)."""
+    
+    COL_NAME, COL_PATH, COL_USED, COL_LIMIT = range(4)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Repository] = []
+        # Cell text per row, formatted once instead of on every paint
+        self._texts: List[List[str]] = []
+        self._headers = [
+            _("repo_col_name"), _("repo_col_path"), _("repo_col_used"), _("repo_col_limit")
+        ]
+    
+    def set_rows(self, rows: List[Tuple[Repository, Optional[int]]]) -> None:
+        """Replace all rows with one model reset; used is None while unknown."""
+        fmt = format_size
+        self.beginResetModel()
+        self._rows = [repo for repo, _used in rows]
+        self._texts = [
+            [
+                repo.name,
+                repo.path,
+                _USED_PENDING if used is None else fmt(used),
+                fmt(repo.max_capacity)
+            ]
+            for repo, used in rows
+        ]
+        self.endResetModel()
+    
+    def set_used(self, repo_id: int, used: int) -> None:
+        """Fill in a repository's used capacity once it is known."""
+        for row, repo in enumerate(self._rows):
+            if repo.id == repo_id:
+                self._texts[row][self.COL_USED] = format_size(used)
+                index = self.index(row, self.COL_USED)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+                return
+    
+    def update_name(self, repo_id: int, name: str) -> None:
+        """Show a repository's new name."""
+        self._update_cell(repo_id, self.COL_NAME, "name", name, name)
+    
+    def update_capacity(self, repo_id: int, max_capacity: int) -> None:
+        """Show a repository's new capacity limit."""
+        self._update_cell(
+            repo_id, self.COL_LIMIT, "max_capacity", max_capacity, format_size(max_capacity)
+        )
+    
+    def _update_cell(self, repo_id: int, column: int, attr: str, value, text: str) -> None:
+        """Set one repository attribute and repaint just its cell."""
+        for row, repo in enumerate(self._rows):
+            if repo.id == repo_id:
+                setattr(repo, attr, value)
+                self._texts[row][column] = text
+                index = self.index(row, column)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+                return
+    
+    def repository(self, row: int) -> Optional[Repository]:
+        """Get the repository shown in a row."""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else 4
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._texts[index.row()][index.column()]
+        if role == Qt.ItemDataRole.UserRole:
+            return self._rows[index.row()].id
+        return None
 
 
 class RepositoryManagerDialog(QDialog):
@@ -29,9 +190,14 @@ class RepositoryManagerDialog(QDialog):
     
     repository_selected = pyqtSignal(int)  # Emits repository ID when selected
     
+    STATS_CACHE_TTL = 5.0  # Seconds a measured used capacity is reused
+    
     def __init__(self, master_key: bytes, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.master_key = master_key
+        # Repository ID -> (used bytes, monotonic time measured)
+        self._stats_cache: Dict[int, Tuple[int, float]] = {}
         self.setWindowTitle(_("repo_mgr_title"))
         self.setMinimumSize(700, 500)
         self.setWindowFlags(
@@ -61,14 +227,21 @@ class RepositoryManagerDialog(QDialog):
         layout.addWidget(subtitle)
         
         # Repository table
-        self.repo_table = QTableWidget()
-        self.repo_table.setColumnCount(4)
-        self.repo_table.setHorizontalHeaderLabels([
-            _("repo_col_name"), _("repo_col_path"), _("repo_col_used"), _("repo_col_limit")
-        ])
-        self.repo_table.horizontalHeader().setSectionResizeMode(
-            1, QHeaderView.ResizeMode.Stretch
+        self.model = RepoTableModel(self)
+        self.repo_table = QTableView()
+        self.repo_table.setModel(self.model)
+        # Fixed row height and preset column widths: Qt never measures cell text
+        vertical_header = self.repo_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(28)
+        header = self.repo_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(
+            RepoTableModel.COL_PATH, QHeaderView.ResizeMode.Stretch
         )
+        self.repo_table.setColumnWidth(RepoTableModel.COL_NAME, 160)
+        self.repo_table.setColumnWidth(RepoTableModel.COL_USED, 100)
+        self.repo_table.setColumnWidth(RepoTableModel.COL_LIMIT, 100)
         self.repo_table.setSelectionBehavior(
             QAbstractItemView.SelectionBehavior.SelectRows
         )
@@ -78,8 +251,8 @@ class RepositoryManagerDialog(QDialog):
         self.repo_table.setEditTriggers(
             QAbstractItemView.EditTrigger.NoEditTriggers
         )
-        self.repo_table.itemSelectionChanged.connect(self._on_selection_changed)
-        self.repo_table.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.repo_table.selectionModel().selectionChanged.connect(self._on_selection_changed)
+        self.repo_table.doubleClicked.connect(self._on_item_double_clicked)
         layout.addWidget(self.repo_table)
         
         # Action buttons
@@ -110,41 +283,45 @@ class RepositoryManagerDialog(QDialog):
     
     def _load_repositories(self):
         """Load repositories into the table."""
-        self.repo_table.setRowCount(0)
         repos = list_repositories()
-        
+        now = time.monotonic()
+        rows = []
+        stale = []
         for repo in repos:
-            try:
-                # Try to load stats (will fail if drive missing)
-                stats = get_repository_stats(repo)
-                used_text = format_size(stats["used"])
-            except Exception:
-                # If path invalid or inaccessible, show 0
-                used_text = format_size(0)
-            
-            row = self.repo_table.rowCount()
-            self.repo_table.insertRow(row)
-            
-            # Name
-            name_item = QTableWidgetItem(repo.name)
-            name_item.setData(Qt.ItemDataRole.UserRole, repo.id)
-            self.repo_table.setItem(row, 0, name_item)
-            
-            # Path
-            self.repo_table.setItem(row, 1, QTableWidgetItem(repo.path))
-            
-            # Used capacity
-            self.repo_table.setItem(row, 2, QTableWidgetItem(used_text))
-            
-            # Max capacity
-            max_text = format_size(repo.max_capacity)
-            self.repo_table.setItem(row, 3, QTableWidgetItem(max_text))
+            cached = self._stats_cache.get(repo.id)
+            if cached is not None and now - cached[1] < self.STATS_CACHE_TTL:
+                rows.append((repo, cached[0]))
+            else:
+                rows.append((repo, None))
+                stale.append(repo)
         
+        # Paint every row at once; used capacity arrives from the thread
+        # pool so a slow or missing drive does not block the dialog
+        self.model.set_rows(rows)
         self._on_selection_changed()
+        
+        pool = QThreadPool.globalInstance()
+        for repo in stale:
+            task = RepoUsageTask(repo.id, repo.path)
+            task.signals.finished.connect(self._on_usage_loaded)
+            pool.start(task)
+    
+    @pyqtSlot(int, object)
+    def _on_usage_loaded(self, repo_id: int, used):
+        """Show a repository's used capacity (0 if it could not be read)."""
+        if used is not None:
+            self._stats_cache[repo_id] = (used, time.monotonic())
+        self.model.set_used(repo_id, used or 0)
+    
+    def _selected_row(self) -> int:
+        """Get the selected row, or -1 when nothing is selected."""
+        selection = self.repo_table.selectionModel()
+        # Single row selection: the current index is on the selected row
+        return selection.currentIndex().row() if selection.hasSelection() else -1
     
-    def _on_selection_changed(self):
+    def _on_selection_changed(self, *args):
         """Handle selection change."""
-        has_selection = len(self.repo_table.selectedItems()) > 0
+        has_selection = self.repo_table.selectionModel().hasSelection()
         self.delete_btn.setEnabled(has_selection)
         self.enter_btn.setEnabled(has_selection)
     
@@ -156,12 +333,12 @@ class RepositoryManagerDialog(QDialog):
     
     def _delete_repository(self):
         """Delete selected repository and all its data."""
-        selected = self.repo_table.selectedItems()
-        if not selected:
+        repo = self.model.repository(self._selected_row())
+        if repo is None:
             return
         
-        repo_id = selected[0].data(Qt.ItemDataRole.UserRole)
-        repo_name = selected[0].text()
+        repo_id = repo.id
+        repo_name = repo.name
         
         reply = QMessageBox.warning(
             self,
@@ -173,6 +350,8 @@ class RepositoryManagerDialog(QDialog):
         
         if reply == QMessageBox.StandardButton.Yes:
             delete_repository(repo_id, delete_files=True)
+            self._stats_cache.pop(repo_id, None)
+            _resolve.cache_clear()
             self._load_repositories()
     
     def _import_repository(self):
@@ -189,51 +368,49 @@ class RepositoryManagerDialog(QDialog):
         
         try:
             repo, was_renamed, _err = import_repository(config_path, self.master_key)
-            
-            if was_renamed:
-                QMessageBox.information(
-                    self,
-                    _("btn_confirm"),
-                    _("msg_import_success_renamed", name=repo.name)
-                )
-            else:
-                QMessageBox.information(
-                    self,
-                    _("btn_confirm"),
-                    _("msg_import_success", name=repo.name)
-                )
-            
-            self._load_repositories()
-            
         except ValueError as e:
             QMessageBox.warning(
                 self,
                 _("msg_import_failed"),
                 str(e)
             )
+            return
         except Exception as e:
             QMessageBox.critical(
                 self,
                 _("msg_import_failed"),
                 _("msg_import_error", error=str(e))
             )
+            return
+        
+        message_key = "msg_import_success_renamed" if was_renamed else "msg_import_success"
+        QMessageBox.information(
+            self,
+            _("btn_confirm"),
+            _(message_key, name=repo.name)
+        )
+        
+        self._load_repositories()
     
-    def _on_item_double_clicked(self, item):
+    def _on_item_double_clicked(self, index: QModelIndex):
         """Handle item double-click - rename on name, change capacity, or enter."""
-        if item.column() == 0:
+        if index.column() == RepoTableModel.COL_NAME:
             # Name column - allow rename
-            self._rename_repository(item)
-        elif item.column() == 3:
+            self._rename_repository(index.row())
+        elif index.column() == RepoTableModel.COL_LIMIT:
             # Capacity column - allow change
-            self._change_capacity(item)
+            self._change_capacity(index.row())
         else:
             # Other columns - enter repository
             self._on_enter()
     
-    def _rename_repository(self, item):
+    def _rename_repository(self, row: int):
         """Rename a repository."""
-        repo_id = item.data(Qt.ItemDataRole.UserRole)
-        current_name = item.text()
+        repo = self.model.repository(row)
+        if repo is None:
+            return
+        repo_id = repo.id
+        current_name = repo.name
         
         new_name, ok = QInputDialog.getText(
             self,
@@ -248,7 +425,8 @@ class RepositoryManagerDialog(QDialog):
         success, error = rename_repository(repo_id, new_name)
         
         if success:
-            self._load_repositories()
+            # Only this row's name changed; used sizes need not be re-read
+            self.model.update_name(repo_id, new_name.strip())
         else:
             QMessageBox.warning(
                 self,
@@ -256,12 +434,12 @@ class RepositoryManagerDialog(QDialog):
                 error
             )
     
-    def _change_capacity(self, item):
+    def _change_capacity(self, row: int):
         """Change repository capacity."""
-        # Get repo ID from the first column of the same row
-        row = item.row()
-        name_item = self.repo_table.item(row, 0)
-        repo_id = name_item.data(Qt.ItemDataRole.UserRole)
+        shown = self.model.repository(row)
+        if shown is None:
+            return
+        repo_id = shown.id
         
         repo = get_repository(repo_id)
         if repo is None:
@@ -285,27 +463,28 @@ class RepositoryManagerDialog(QDialog):
         
         new_capacity = int(new_gb * 1024 * 1024 * 1024)
         
-        # Update in global database
+        # Update in global database (committed on exit, rolled back on error)
         db = get_global_database()
-        db.execute(
-            "UPDATE repositories SET max_capacity = ? WHERE id = ?",
-            (new_capacity, repo_id)
-        )
-        db._connection.commit()
+        with db._connection:
+            db.execute(
+                "UPDATE repositories SET max_capacity = ? WHERE id = ?",
+                (new_capacity, repo_id)
+            )
         
         # Update config file
         repo.max_capacity = new_capacity
         save_repository_config(repo)
         
-        self._load_repositories()
+        # Only this row's limit changed; used sizes need not be re-read
+        self.model.update_capacity(repo_id, new_capacity)
     
     def _on_enter(self):
         """Enter selected repository with validation."""
-        selected = self.repo_table.selectedItems()
-        if not selected:
+        shown = self.model.repository(self._selected_row())
+        if shown is None:
             return
         
-        repo_id = selected[0].data(Qt.ItemDataRole.UserRole)
+        repo_id = shown.id
         
         # Get fresh repository data
         repo = get_repository(repo_id)
@@ -346,9 +525,16 @@ class CreateRepositoryDialog(QDialog):
     
     def __init__(self, master_key: bytes, parent=None):
         super().__init__(parent)
+        watch_window(self)
         self.master_key = master_key
         self.setWindowTitle(_("btn_create_repo"))
         self.setFixedSize(500, 350)
+        # Disk info is refreshed once typing in the path field pauses
+        self._path_timer = QTimer(self)
+        self._path_timer.setSingleShot(True)
+        self._path_timer.setInterval(250)
+        self._path_timer.timeout.connect(self._update_disk_info)
+        _disk_total_cache.clear()
         self._setup_ui()
     
     def _setup_ui(self):
@@ -356,18 +542,20 @@ class CreateRepositoryDialog(QDialog):
         layout.setSpacing(6)  # Reduce default spacing
         layout.setContentsMargins(24, 24, 24, 24)
         
-        # Name
-        name_label = QLabel(_("repo_col_name") + ":")
-        layout.addWidget(name_label)
+        form = QFormLayout()
+        form.setVerticalSpacing(16)
+        form.setHorizontalSpacing(8)
         
+        # Name
         self.name_input = QLineEdit()
         self.name_input.setPlaceholderText(_("placeholder_repo_name"))
-        layout.addWidget(self.name_input)
+        form.addRow(_("repo_col_name") + ":", self.name_input)
         
-        # Path - add section spacing
-        layout.addSpacing(16)
-        path_label = QLabel(_("repo_col_path") + ":")
-        layout.addWidget(path_label)
+        # Path, with disk info directly below it
+        path_field = QWidget()
+        path_field_layout = QVBoxLayout(path_field)
+        path_field_layout.setContentsMargins(0, 0, 0, 0)
+        path_field_layout.setSpacing(2)
         
         path_layout = QHBoxLayout()
         path_layout.setSpacing(8)
@@ -380,19 +568,14 @@ class CreateRepositoryDialog(QDialog):
         browse_btn.setFixedWidth(80)
         browse_btn.clicked.connect(self._browse_path)
         path_layout.addWidget(browse_btn)
-        layout.addLayout(path_layout)
+        path_field_layout.addLayout(path_layout)
         
-        # Disk info - smaller spacing as it belongs to path section
         self.disk_info = QLabel("")
         self.disk_info.setProperty("class", "subtitle")
-        self.disk_info.setContentsMargins(0, 2, 0, 0)
-        layout.addWidget(self.disk_info)
-        
-        # Capacity - add section spacing
-        layout.addSpacing(16)
-        capacity_label = QLabel(_("repo_col_limit") + ":")
-        layout.addWidget(capacity_label)
+        path_field_layout.addWidget(self.disk_info)
+        form.addRow(_("repo_col_path") + ":", path_field)
         
+        # Capacity
         capacity_layout = QHBoxLayout()
         capacity_layout.setSpacing(8)
         self.capacity_input = QSpinBox()
@@ -406,7 +589,9 @@ class CreateRepositoryDialog(QDialog):
         self.unit_combo.setFixedWidth(80)
         capacity_layout.addWidget(self.unit_combo)
         capacity_layout.addStretch()
-        layout.addLayout(capacity_layout)
+        form.addRow(_("repo_col_limit") + ":", capacity_layout)
+        
+        layout.addLayout(form)
         
         # Error label
         self.error_label = QLabel("")
@@ -442,27 +627,23 @@ class CreateRepositoryDialog(QDialog):
             self.path_input.setText(path)
     
     def _on_path_changed(self):
-        """Update disk info when path changes."""
+        """Schedule a disk info update when the path changes."""
+        self._path_timer.start()
+    
+    @pyqtSlot()
+    def _update_disk_info(self):
+        """Update disk info for the current path."""
         path = self.path_input.text()
         if not path or not Path(path).exists():
             self.disk_info.setText("")
             return
         
-        total = get_disk_total_space(path)
+        total = _volume_total_space(path)
         self.disk_info.setText(_("disk_info", total=format_size(total)))
     
     def _get_capacity_bytes(self) -> int:
         """Get capacity in bytes."""
-        value = self.capacity_input.value()
-        unit = self.unit_combo.currentText()
-        
-        multipliers = {
-            "MB": 1024 * 1024,
-            "GB": 1024 * 1024 * 1024,
-            "TB": 1024 * 1024 * 1024 * 1024,
-        }
-        
-        return value * multipliers[unit]
+        return self.capacity_input.value() * _CAPACITY_MULTIPLIERS[self.unit_combo.currentText()]
     
     def _create_repository(self):
         """Create the repository."""
@@ -479,10 +660,9 @@ class CreateRepositoryDialog(QDialog):
         
         # Check for duplicate name
         existing_repos = list_repositories()
-        for repo in existing_repos:
-            if repo.name.lower() == name.lower():
-                self.error_label.setText(_("error_repo_name_exists"))
-                return
+        if name.lower() in {repo.name.lower() for repo in existing_repos}:
+            self.error_label.setText(_("error_repo_name_exists"))
+            return
         
         if not path:
             self.error_label.setText(_("error_repo_path_required"))
@@ -492,14 +672,13 @@ class CreateRepositoryDialog(QDialog):
         normalized_path = str(Path(path).resolve())
         
         # Check for duplicate path
-        existing_repos = list_repositories()
-        for repo in existing_repos:
-            if str(Path(repo.path).resolve()) == normalized_path:
-                self.error_label.setText(_("error_repo_path_exists"))
-                return
+        existing_paths = {_resolve(repo.path) for repo in existing_repos}
+        if normalized_path in existing_paths:
+            self.error_label.setText(_("error_repo_path_exists"))
+            return
         
         # Check disk capacity
-        disk_total = get_disk_total_space(path if Path(path).exists() else str(Path(path).parent))
+        disk_total = _volume_total_space(path if Path(path).exists() else str(Path(path).parent))
         if capacity > disk_total:
             self.error_label.setText(
                 _("error_capacity_too_small", size=format_size(capacity), total=format_size(disk_total))
@@ -3,6 +3,9 @@ Secure Vault - UI Styles
 Dark and light theme stylesheets for Windows Explorer-like appearance.
 """
 
+from functools import lru_cache
+from string import Template
+
 # Color palette - Dark theme
 DARK_COLORS = {
     "bg_primary": "#1e1e1e",
@@ -44,458 +47,466 @@ LIGHT_COLORS = {
 }
 
 
-def get_stylesheet(dark_mode: bool = True) -> str:
-    """
-    Get the complete stylesheet for the application.
-    
-    Args:
-        dark_mode: If True, return dark theme; otherwise light theme
-    
-    Returns:
-        QSS stylesheet string
-    """
-    c = DARK_COLORS if dark_mode else LIGHT_COLORS
-    
-    return f"""
+# Application stylesheet; ${name} placeholders are keys of the color palettes
+_QSS_TEMPLATE = Template("""
     /* Global styles */
-    QWidget {{
-        background-color: {c["bg_primary"]};
-        color: {c["text_primary"]};
+    QWidget {
+        background-color: ${bg_primary};
+        color: ${text_primary};
         font-family: "Segoe UI", "Microsoft YaHei UI", sans-serif;
         font-size: 13px;
-    }}
+    }
     
     /* Main window */
-    QMainWindow {{
-        background-color: {c["bg_primary"]};
-    }}
+    QMainWindow {
+        background-color: ${bg_primary};
+    }
     
     /* Dialog */
-    QDialog {{
-        background-color: {c["bg_primary"]};
-    }}
+    QDialog {
+        background-color: ${bg_primary};
+    }
     
     /* Labels */
-    QLabel {{
-        color: {c["text_primary"]};
+    QLabel {
+        color: ${text_primary};
         background: transparent;
-    }}
+    }
     
-    QLabel[class="title"] {{
+    QLabel[class="title"] {
         font-size: 20px;
         font-weight: bold;
-    }}
+    }
     
-    QLabel[class="subtitle"] {{
+    QLabel[class="subtitle"] {
         font-size: 14px;
-        color: {c["text_secondary"]};
-    }}
+        color: ${text_secondary};
+    }
     
     /* Buttons */
-    QPushButton {{
-        background-color: {c["bg_tertiary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QPushButton {
+        background-color: ${bg_tertiary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 8px 16px;
         min-width: 80px;
         min-height: 18px;
-    }}
+    }
     
-    QPushButton:hover {{
-        background-color: {c["bg_hover"]};
-        border-color: {c["accent"]};
-    }}
+    QPushButton:hover {
+        background-color: ${bg_hover};
+        border-color: ${accent};
+    }
     
-    QPushButton:pressed {{
-        background-color: {c["accent"]};
-    }}
+    QPushButton:pressed {
+        background-color: ${accent};
+    }
     
-    QPushButton:disabled {{
-        color: {c["text_muted"]};
-        background-color: {c["bg_secondary"]};
-    }}
+    QPushButton:disabled {
+        color: ${text_muted};
+        background-color: ${bg_secondary};
+    }
     
-    QPushButton[class="primary"] {{
-        background-color: {c["accent"]};
-        border-color: {c["accent"]};
+    QPushButton[class="primary"] {
+        background-color: ${accent};
+        border-color: ${accent};
         color: white;
-    }}
+    }
     
-    QPushButton[class="primary"]:hover {{
-        background-color: {c["accent_hover"]};
-    }}
+    QPushButton[class="primary"]:hover {
+        background-color: ${accent_hover};
+    }
     
-    QPushButton[class="danger"] {{
-        background-color: {c["error"]};
-        border-color: {c["error"]};
+    QPushButton[class="danger"] {
+        background-color: ${error};
+        border-color: ${error};
         color: white;
-    }}
+    }
     
-    QPushButton[class="icon"] {{
+    QPushButton[class="icon"] {
         background: transparent;
         border: none;
         padding: 4px;
         min-width: 32px;
         min-height: 32px;
         border-radius: 4px;
-    }}
+    }
     
-    QPushButton[class="icon"]:hover {{
-        background-color: {c["bg_hover"]};
-    }}
+    QPushButton[class="icon"]:hover {
+        background-color: ${bg_hover};
+    }
     
     /* Line Edit */
-    QLineEdit {{
-        background-color: {c["bg_tertiary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QLineEdit {
+        background-color: ${bg_tertiary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 10px 14px;
         font-size: 14px;
         min-height: 17px;
-        selection-background-color: {c["accent"]};
-    }}
+        selection-background-color: ${accent};
+    }
     
-    QLineEdit::placeholder {{
-        color: {c["text_muted"]};
-    }}
+    QLineEdit::placeholder {
+        color: ${text_muted};
+    }
     
-    QLineEdit:focus {{
-        border-color: {c["accent"]};
-        background-color: {c["bg_secondary"]};
-    }}
+    QLineEdit:focus {
+        border-color: ${accent};
+        background-color: ${bg_secondary};
+    }
     
-    QLineEdit:disabled {{
-        background-color: {c["bg_tertiary"]};
-        color: {c["text_muted"]};
-    }}
+    QLineEdit:disabled {
+        background-color: ${bg_tertiary};
+        color: ${text_muted};
+    }
     
     /* Spin Box */
-    QSpinBox, QDoubleSpinBox {{
-        background-color: {c["bg_tertiary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QSpinBox, QDoubleSpinBox {
+        background-color: ${bg_tertiary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 4px 8px;
         min-height: 18px;
-    }}
+    }
     
     QSpinBox::up-button, QSpinBox::down-button,
-    QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {{
+    QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
         width: 20px;
         border: none;
         background: transparent;
-    }}
+    }
     
-    QSpinBox:focus, QDoubleSpinBox:focus {{
-        border-color: {c["accent"]};
-    }}
+    QSpinBox:focus, QDoubleSpinBox:focus {
+        border-color: ${accent};
+    }
     
     /* Combo Box */
-    QComboBox {{
-        background-color: {c["bg_tertiary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QComboBox {
+        background-color: ${bg_tertiary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 4px 12px;
         min-width: 80px;
         min-height: 18px;
-    }}
+    }
 
-    QComboBox:hover {{
-        border-color: {c["accent"]};
-    }}
+    QComboBox:hover {
+        border-color: ${accent};
+    }
 
-    QComboBox::drop-down {{
+    QComboBox::drop-down {
         border: none;
         width: 0px;
         height: 0px;
         background: transparent;
-    }}
+    }
 
-    QComboBox::down-arrow {{
+    QComboBox::down-arrow {
         image: none;
         border: none;
         background: transparent;
-    }}
+    }
 
-    QComboBox QAbstractItemView {{
-        background-color: {c["bg_secondary"]};
-        border: 1px solid {c["border"]};
-        selection-background-color: {c["bg_selected"]};
-    }}
+    QComboBox QAbstractItemView {
+        background-color: ${bg_secondary};
+        border: 1px solid ${border};
+        selection-background-color: ${bg_selected};
+    }
 
     /* Title bar combo box (transparent background) */
-    QComboBox[class="titlebar"] {{
+    QComboBox[class="titlebar"] {
         background-color: transparent;
         border: 1px solid transparent;
         padding: 4px 8px;
-    }}
+    }
 
-    QComboBox[class="titlebar"]:hover {{
-        background-color: {c["bg_hover"]};
+    QComboBox[class="titlebar"]:hover {
+        background-color: ${bg_hover};
         border-color: transparent;
-    }}
+    }
 
-    QComboBox[class="titlebar"]::drop-down {{
+    QComboBox[class="titlebar"]::drop-down {
         width: 0px;
         height: 0px;
         border: none;
         background: transparent;
-    }}
+    }
 
-    QComboBox[class="titlebar"]::down-arrow {{
+    QComboBox[class="titlebar"]::down-arrow {
         image: none;
         width: 0px;
         height: 0px;
         border: none;
         background: transparent;
-    }}
+    }
 
-    QComboBox[class="titlebar"] QAbstractItemView {{
-        background-color: {c["bg_secondary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
-        selection-background-color: {c["bg_selected"]};
+    QComboBox[class="titlebar"] QAbstractItemView {
+        background-color: ${bg_secondary};
+        color: ${text_primary};
+        border: 1px solid ${border};
+        selection-background-color: ${bg_selected};
         outline: none;
-    }}
+    }
 
-    QComboBox[class="titlebar"] QAbstractItemView::item {{
+    QComboBox[class="titlebar"] QAbstractItemView::item {
         padding: 6px 12px;
         border: none;
-    }}
+    }
 
-    QComboBox[class="titlebar"] QAbstractItemView::item:selected {{
-        background-color: {c["bg_selected"]};
-        color: {c["text_primary"]};
-    }}
+    QComboBox[class="titlebar"] QAbstractItemView::item:selected {
+        background-color: ${bg_selected};
+        color: ${text_primary};
+    }
 
     
     /* Tree View (File Explorer style) */
-    QTreeView {{
-        background-color: {c["bg_primary"]};
-        alternate-background-color: {c["bg_secondary"]};
+    QTreeView {
+        background-color: ${bg_primary};
+        alternate-background-color: ${bg_secondary};
         border: none;
-        border-top: 1px solid {c["border"]};
+        border-top: 1px solid ${border};
         border-radius: 0px;
         outline: none;
-    }}
+    }
     
-    QTreeView::item {{
+    QTreeView::item {
         padding: 4px 8px;
         border: none;
-    }}
+    }
     
-    QTreeView::item:hover {{
-        background-color: {c["bg_hover"]};
-    }}
+    QTreeView::item:hover {
+        background-color: ${bg_hover};
+    }
     
-    QTreeView::item:selected {{
-        background-color: {c["bg_selected"]};
-    }}
+    QTreeView::item:selected {
+        background-color: ${bg_selected};
+    }
     
-    QTreeView::branch {{
+    QTreeView::branch {
         background: transparent;
-    }}
+    }
     
     QTreeView::branch:has-children:!has-siblings:closed,
-    QTreeView::branch:closed:has-children:has-siblings {{
+    QTreeView::branch:closed:has-children:has-siblings {
         border-image: none;
-    }}
+    }
     
     QTreeView::branch:open:has-children:!has-siblings,
-    QTreeView::branch:open:has-children:has-siblings {{
+    QTreeView::branch:open:has-children:has-siblings {
         border-image: none;
-    }}
+    }
     
     /* Header View */
-    QHeaderView {{
-        background-color: {c["bg_secondary"]};
+    QHeaderView {
+        background-color: ${bg_secondary};
         border: none;
-    }}
+    }
     
-    QHeaderView::section {{
-        background-color: {c["bg_secondary"]};
-        color: {c["text_primary"]};
+    QHeaderView::section {
+        background-color: ${bg_secondary};
+        color: ${text_primary};
         padding: 8px 12px;
         border: none;
-        border-right: 1px solid {c["border"]};
-        border-bottom: 1px solid {c["border"]};
-    }}
+        border-right: 1px solid ${border};
+        border-bottom: 1px solid ${border};
+    }
     
-    QHeaderView::section:hover {{
-        background-color: {c["bg_hover"]};
-    }}
+    QHeaderView::section:hover {
+        background-color: ${bg_hover};
+    }
     
-    QHeaderView::section:pressed {{
-        background-color: {c["bg_tertiary"]};
-    }}
+    QHeaderView::section:pressed {
+        background-color: ${bg_tertiary};
+    }
     
     /* Table View */
-    QTableView {{
-        background-color: {c["bg_primary"]};
-        border: 1px solid {c["border"]};
-        gridline-color: {c["border"]};
-    }}
+    QTableView {
+        background-color: ${bg_primary};
+        border: 1px solid ${border};
+        gridline-color: ${border};
+    }
     
-    QTableView::item {{
+    QTableView::item {
         padding: 6px;
-    }}
+    }
     
-    QTableView::item:selected {{
-        background-color: {c["bg_selected"]};
-    }}
+    QTableView::item:selected {
+        background-color: ${bg_selected};
+    }
     
     /* Scroll Bar */
-    QScrollBar:vertical {{
-        background-color: {c["bg_primary"]};
+    QScrollBar:vertical {
+        background-color: ${bg_primary};
         width: 12px;
         margin: 0;
-    }}
+    }
     
-    QScrollBar::handle:vertical {{
-        background-color: {c["scrollbar"]};
+    QScrollBar::handle:vertical {
+        background-color: ${scrollbar};
         min-height: 30px;
         border-radius: 6px;
         margin: 2px;
-    }}
+    }
     
-    QScrollBar::handle:vertical:hover {{
-        background-color: {c["scrollbar_hover"]};
-    }}
+    QScrollBar::handle:vertical:hover {
+        background-color: ${scrollbar_hover};
+    }
     
-    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
         height: 0;
-    }}
+    }
     
-    QScrollBar:horizontal {{
-        background-color: {c["bg_primary"]};
+    QScrollBar:horizontal {
+        background-color: ${bg_primary};
         height: 12px;
         margin: 0;
-    }}
+    }
     
-    QScrollBar::handle:horizontal {{
-        background-color: {c["scrollbar"]};
+    QScrollBar::handle:horizontal {
+        background-color: ${scrollbar};
         min-width: 30px;
         border-radius: 6px;
         margin: 2px;
-    }}
+    }
     
-    QScrollBar::handle:horizontal:hover {{
-        background-color: {c["scrollbar_hover"]};
-    }}
+    QScrollBar::handle:horizontal:hover {
+        background-color: ${scrollbar_hover};
+    }
     
-    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
         width: 0;
-    }}
+    }
     
     /* Progress Bar */
-    QProgressBar {{
-        background-color: {c["bg_tertiary"]};
+    QProgressBar {
+        background-color: ${bg_tertiary};
         border: none;
         border-radius: 4px;
         height: 8px;
         text-align: center;
-    }}
+    }
     
-    QProgressBar::chunk {{
-        background-color: {c["accent"]};
+    QProgressBar::chunk {
+        background-color: ${accent};
         border-radius: 4px;
-    }}
+    }
     
     /* Text Edit / Plain Text Edit (Log view) */
-    QTextEdit, QPlainTextEdit {{
-        background-color: {c["bg_secondary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QTextEdit, QPlainTextEdit {
+        background-color: ${bg_secondary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 8px;
         font-family: "Cascadia Code", "Consolas", monospace;
         font-size: 12px;
-    }}
+    }
     
     /* Menu */
-    QMenu {{
-        background-color: {c["bg_secondary"]};
-        border: 1px solid {c["border"]};
+    QMenu {
+        background-color: ${bg_secondary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 4px;
-    }}
+    }
     
-    QMenu::item {{
+    QMenu::item {
         padding: 8px 24px;
         border-radius: 4px;
-    }}
+    }
     
-    QMenu::item:selected {{
-        background-color: {c["bg_hover"]};
-    }}
+    QMenu::item:selected {
+        background-color: ${bg_hover};
+    }
     
-    QMenu::separator {{
+    QMenu::separator {
         height: 1px;
-        background-color: {c["border"]};
+        background-color: ${border};
         margin: 4px 8px;
-    }}
+    }
     
     /* Message Box */
-    QMessageBox {{
-        background-color: {c["bg_primary"]};
-    }}
+    QMessageBox {
+        background-color: ${bg_primary};
+    }
     
-    QMessageBox QLabel {{
-        color: {c["text_primary"]};
-    }}
+    QMessageBox QLabel {
+        color: ${text_primary};
+    }
     
     /* Splitter */
-    QSplitter::handle {{
-        background-color: {c["border"]};
-    }}
+    QSplitter::handle {
+        background-color: ${border};
+    }
     
-    QSplitter::handle:horizontal {{
+    QSplitter::handle:horizontal {
         width: 2px;
-    }}
+    }
     
-    QSplitter::handle:vertical {{
+    QSplitter::handle:vertical {
         height: 2px;
-    }}
+    }
     
     /* Frame */
-    QFrame[class="card"] {{
-        background-color: {c["bg_secondary"]};
-        border: 1px solid {c["border"]};
+    QFrame[class="card"] {
+        background-color: ${bg_secondary};
+        border: 1px solid ${border};
         border-radius: 8px;
-    }}
+    }
     
     /* Group Box */
-    QGroupBox {{
-        border: 1px solid {c["border"]};
+    QGroupBox {
+        border: 1px solid ${border};
         border-radius: 4px;
         margin-top: 12px;
         padding-top: 8px;
-    }}
+    }
     
-    QGroupBox::title {{
+    QGroupBox::title {
         subcontrol-origin: margin;
         left: 12px;
         padding: 0 4px;
-    }}
+    }
     
     /* ToolTip */
-    QToolTip {{
-        background-color: {c["bg_secondary"]};
-        color: {c["text_primary"]};
-        border: 1px solid {c["border"]};
+    QToolTip {
+        background-color: ${bg_secondary};
+        color: ${text_primary};
+        border: 1px solid ${border};
         border-radius: 4px;
         padding: 4px 8px;
-    }}
+    }
+    """)
+
+
+@lru_cache(maxsize=2)
+def get_stylesheet(dark_mode: bool = True) -> str:
+    """
+    Get the complete stylesheet for the application.
+    
+    The result depends only on dark_mode, so each theme is built once.
+    
+    Args:
+        dark_mode: If True, return dark theme; otherwise light theme
+    
+    Returns:
+        QSS stylesheet string
     """
+    return _QSS_TEMPLATE.substitute(DARK_COLORS if dark_mode else LIGHT_COLORS)
 
 
+@lru_cache(maxsize=2)
 def get_log_colors(dark_mode: bool = True) -> dict:
     """
     Get colors for log level highlighting.
     
+    The dictionary is shared between callers and must not be modified.
+    
     Returns:
         Dictionary mapping log levels to colors
     """
@@ -1,84 +1,160 @@
 import sys
 import ctypes
+import weakref
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtCore import QObject, QEvent
 
+from src.core.config import get_config
+
+# Compared as a plain int so non-Show events skip the enum comparison
+_SHOW_EVENT = int(QEvent.Type.Show)
+
+# DWMWA_USE_IMMERSIVE_DARK_MODE is 20 from build 18985 and 19 on 1809-1903;
+# None where the title bar cannot be themed. Resolved once at import.
+_DWM_DARK_MODE_ATTR = None
+_DwmSetWindowAttribute = None
+if sys.platform == "win32":
+    from ctypes import wintypes
+    
+    _win_version = sys.getwindowsversion()
+    if _win_version.major == 10 and _win_version.build >= 17763:
+        _DWM_DARK_MODE_ATTR = 20 if _win_version.build >= 18985 else 19
+        try:
+            _DwmSetWindowAttribute = ctypes.windll.dwmapi.DwmSetWindowAttribute
+            _DwmSetWindowAttribute.argtypes = [
+                wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD
+            ]
+            _DwmSetWindowAttribute.restype = ctypes.c_long  # HRESULT, not raised
+        except (OSError, AttributeError):
+            _DWM_DARK_MODE_ATTR = None
+
+def _set_dark_title_bar(hwnd: int, dark_mode: bool):
+    """Set the immersive dark-mode attribute on a native window handle."""
+    value = ctypes.c_int(1 if dark_mode else 0)
+    _DwmSetWindowAttribute(
+        hwnd, _DWM_DARK_MODE_ATTR, ctypes.byref(value), ctypes.sizeof(value)
+    )
+
 def apply_native_theme(window: QWidget, dark_mode: bool):
     """
     Apply native Windows theme to the window title bar.
-    Only supports Windows 10 (1809+) and Windows 11.
-    """
-    if sys.platform != "win32":
-        return
-
-    from PyQt6.QtCore import QTimer
+    Only supports Windows 10 (1809+) and Windows 11; replaced with a no-op
+    at import elsewhere.
     
-    def _do_apply():
-        try:
-            if not window.isVisible() and not window.isWindow():
-                return
-            
-            hwnd = int(window.winId())
-            if not hwnd:
+    Applied once per call: callers run it on Show or first focus, when the
+    HWND already exists, so no delayed re-apply is needed for it to stick.
+    The HWND of a tracked window is cached for later theme toggles, and a
+    repeat call for the same HWND and mode is skipped.
+    """
+    try:
+        if not window.isVisible() and not window.isWindow():
+            return
+        
+        hwnd = int(window.winId())
+        if not hwnd:
+            return
+        state = (hwnd, dark_mode)
+        tracked = _theme_windows.get(window)
+        if tracked is not None:
+            if tracked == state:
                 return
-                
-            win_version = sys.getwindowsversion()
-            if win_version.major == 10 and win_version.build >= 17763:
-                attribute = 20 if win_version.build >= 18985 else 19
-                value = ctypes.c_int(1 if dark_mode else 0)
-                ctypes.windll.dwmapi.DwmSetWindowAttribute(
-                    hwnd, 
-                    attribute, 
-                    ctypes.byref(value), 
-                    ctypes.sizeof(value)
-                )
-        except Exception:
-            pass
-            
-    # Apply immediately
-    _do_apply()
-    # Also apply after a small delay to ensure it "sticks" as OS mappings settle
-    QTimer.singleShot(50, _do_apply)
+            _theme_windows[window] = state
+        
+        _set_dark_title_bar(hwnd, dark_mode)
+    except Exception:
+        pass
 
 class NativeThemeEventFilter(QObject):
     """
-    Global event filter to apply native theme to all windows as they are shown.
+    Per-window event filter that re-applies the native theme when a window is shown.
+    Installed on each top-level widget rather than the application, so Python
+    only sees that window's own events instead of every event in the app.
     """
     def eventFilter(self, obj, event):
-        if event.type() == QEvent.Type.Show:
-            if isinstance(obj, QWidget) and obj.isWindow():
-                from src.core.config import get_config
-                config = get_config()
-                apply_native_theme(obj, config.dark_mode)
-        return super().eventFilter(obj, event)
+        if event.type() != _SHOW_EVENT:
+            return False
+        if isinstance(obj, QWidget) and obj.isWindow():
+            apply_native_theme(obj, get_config().dark_mode)
+        # QObject.eventFilter always returns False; skip the C++ round trip
+        return False
 
 # Global filter instance to prevent garbage collection
 _global_filter = None
+_focus_hooked = False
 
-def install_theme_filter(app):
+# Windows the filter is installed on, mapped to the (HWND, dark_mode) last
+# applied ((0, None) until themed). Theme toggles walk this instead of
+# marshalling app.topLevelWidgets(), reuse the HWND instead of calling winId()
+# and skip windows already in the requested mode. Show refreshes the HWND, as
+# a recreated native window is always shown again. Entries die with the window.
+_theme_windows: "weakref.WeakKeyDictionary[QWidget, tuple]" = weakref.WeakKeyDictionary()
+
+def watch_window(widget: QWidget):
     """
-    Install the global theme event filter on the application.
+    Track a top-level widget so its title bar is themed from its first show.
+    
+    Call from the window's constructor: the filter is installed before the
+    native window exists, so the first Show themes the HWND before it is
+    mapped and the window never opens with the wrong title bar.
     """
     global _global_filter
+    if widget.property("_vault_theme_filter"):
+        return
     if _global_filter is None:
         _global_filter = NativeThemeEventFilter()
-        app.installEventFilter(_global_filter)
-    
-    # Also apply to all existing windows
-    from src.core.config import get_config
-    update_all_windows_theme(get_config().dark_mode)
+    widget.setProperty("_vault_theme_filter", True)
+    widget.installEventFilter(_global_filter)
+    _theme_windows[widget] = (0, None)
+    # Already on screen (fallback paths): theme it now; otherwise the Show
+    # filter does it without forcing an early winId()
+    if widget.isVisible():
+        apply_native_theme(widget, get_config().dark_mode)
 
-def update_all_windows_theme(dark_mode: bool):
+def _on_focus_window_changed(window):
     """
-    Force update the native theme of all top-level windows.
+    Fallback for windows not created through watch_window (e.g. the static
+    QMessageBox helpers): pick them up the first time they get focus.
     """
-    from PyQt6.QtWidgets import QApplication
-    app = QApplication.instance()
-    if not app:
+    if window is None:
         return
-        
+    widget = QWidget.find(window.winId())
+    if widget is not None and widget.isWindow():
+        watch_window(widget)
+
+def install_theme_filter(app):
+    """
+    Theme all current top-level windows and, as a fallback, any window
+    opened later without watch_window().
+    """
+    global _focus_hooked
+    if not _focus_hooked:
+        _focus_hooked = True
+        app.focusWindowChanged.connect(_on_focus_window_changed)
+    
+    # Also apply to all existing windows
     for widget in app.topLevelWidgets():
         if widget.isWindow():
+            watch_window(widget)
+
+def update_all_windows_theme(dark_mode: bool):
+    """
+    Force update the native theme of all visible tracked windows.
+    Hidden ones are re-themed by the filter when they are shown again.
+    """
+    for widget, (hwnd, applied) in list(_theme_windows.items()):
+        if applied == dark_mode:
+            continue
+        try:
+            if not widget.isVisible():
+                continue
+        except RuntimeError:
+            # Underlying C++ window already deleted
+            _theme_windows.pop(widget, None)
+            continue
+        if hwnd:
+            _theme_windows[widget] = (hwnd, dark_mode)
+            _set_dark_title_bar(hwnd, dark_mode)
+        else:
             apply_native_theme(widget, dark_mode)
 
 def patch_qt_dialogs():
@@ -87,3 +163,14 @@ def patch_qt_dialogs():
     app = QApplication.instance()
     if app:
         install_theme_filter(app)
+
+def _theme_noop(*args, **kwargs):
+    """Stand-in where the native title bar cannot be themed."""
+
+# Nothing to theme off Windows (or before 1809): bind no-ops so no filter or
+# focus hook is installed and callers skip the per-call checks entirely
+if _DWM_DARK_MODE_ATTR is None:
+    apply_native_theme = _theme_noop
+    watch_window = _theme_noop
+    install_theme_filter = _theme_noop
+    update_all_windows_theme = _theme_noop
@@ -3,32 +3,66 @@ Secure Vault - File Utilities
 Helpers for file naming and path handling.
 """
 
-from typing import Set
-from pathlib import Path
+import re
+from typing import FrozenSet, Optional, Set
 
 
-def get_unique_filename(name: str, existing_names: Set[str]) -> str:
+# "stem (N).ext" - group 1 is the stem, 2 the counter, 3 the optional suffix
+_COLLISION_RE = re.compile(r"^(.*) \((\d+)\)(\.[^.]*)?$")
+
+
+def get_unique_filename(
+    name: str,
+    existing_names: Set[str],
+    *,
+    existing_casefold: Optional[FrozenSet[str]] = None
+) -> str:
     """
     Get a unique filename by appending (N) if collision occurs.
     Windows-style collision resolution: file.txt -> file (2).txt -> file (3).txt
     
+    The existing names are scanned once for the highest "stem (N)suffix"
+    already taken and N+1 is returned, instead of probing 1, 2, 3... which
+    is quadratic when many copies of one name land in the same folder.
+    
     Args:
         name: Desired filename (e.g., "file.txt")
         existing_names: Set of names already in the destination
+        existing_casefold: Optional prebuilt set of str.casefold()ed names.
+            When given, names are compared case-insensitively against it
+            (and existing_names is ignored), so "File.TXT" collides with
+            "file.txt" and "STRASSE" with "straße" as they would on a
+            case-insensitive disk. Build it once per folder.
         
     Returns:
         Unique filename
     """
-    if name not in existing_names:
-        return name
+    if existing_casefold is None:
+        taken = existing_names
+        if name not in taken:
+            return name
+    else:
+        taken = existing_casefold
+        if name.casefold() not in taken:
+            return name
     
-    path_obj = Path(name)
-    stem = path_obj.stem
-    suffix = path_obj.suffix
+    # Same split as Path.stem/Path.suffix without building a Path: a leading
+    # or trailing dot does not start a suffix
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        stem, suffix = name[:dot], name[dot:]
+    else:
+        stem, suffix = name, ""
+    if existing_casefold is None:
+        stem_key, suffix_key = stem, suffix
+    else:
+        stem_key, suffix_key = stem.casefold(), suffix.casefold()
     
-    counter = 1
-    while True:
-        new_name = f"{stem} ({counter}){suffix}"
-        if new_name not in existing_names:
-            return new_name
-        counter += 1
+    highest = 0
+    for existing in taken:
+        match = _COLLISION_RE.match(existing)
+        if match and match.group(1) == stem_key and (match.group(3) or "") == suffix_key:
+            counter = int(match.group(2))
+            if counter > highest:
+                highest = counter
+    return f"{stem} ({highest + 1}){suffix}"
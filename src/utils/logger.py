@@ -4,20 +4,40 @@ Daily rotating logs with 30-day auto cleanup.
 """
 
 import logging
-from datetime import datetime
+import time
+from collections import deque
 from typing import Optional
 import threading
 
 from src.core.i18n import _
 
 
+def _format_operation(operation: str, target: str, details: str, status: str, status_key: str) -> str:
+    """Build an operation() message; status_key, if set, is translated here."""
+    if status_key:
+        status = _(status_key)
+    message = f"[{operation}] {target}"
+    if details:
+        message += f" - {details}"
+    if status:
+        message = f"{status}: {message}"
+    return message
+
 
 class VaultLogger:
     """Logger with memory-only logs for UI display."""
     
+    # Fixed attribute slots: the hot paths read these on every log call
+    __slots__ = (
+        "_initialized", "_logger", "_callbacks", "_batch_callbacks",
+        "_ts_cache", "_queue", "_wake", "_drain_thread"
+    )
+    
     _instance: Optional["VaultLogger"] = None
     _lock = threading.Lock()
     
+    QUEUE_SIZE = 16384  # Oldest records are dropped if the drain thread falls this far behind
+    
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -33,67 +53,156 @@ class VaultLogger:
         self._initialized = True
         self._logger = logging.getLogger("SecureVault")
         self._logger.setLevel(logging.DEBUG)
-        self._callbacks: list = []
+        # Replaced, never mutated, so readers iterate a snapshot without locking
+        self._callbacks: tuple = ()
+        self._batch_callbacks: tuple = ()  # Called once per drained batch
+        # (epoch second, "%H:%M:%S") of the last timestamp formatted; one
+        # tuple so threads never see a second paired with another's text
+        self._ts_cache: tuple = (-1, "")
         
         # We no longer setup file handlers as requested: "不要保存log文件"
+        
+        # Callers only append (created, levelno, level, message) here; the
+        # drain thread does the logging and callback work off their thread
+        self._queue: deque = deque(maxlen=self.QUEUE_SIZE)
+        self._wake = threading.Event()
+        self._drain_thread = threading.Thread(
+            target=self._drain,
+            name="vault-log-drain",
+            daemon=True
+        )
+        self._drain_thread.start()
     
     def add_callback(self, callback) -> None:
         """Add callback for log messages (for UI updates)."""
-        self._callbacks.append(callback)
+        with self._lock:
+            self._callbacks = self._callbacks + (callback,)
     
     def remove_callback(self, callback) -> None:
         """Remove a log callback."""
-        if callback in self._callbacks:
-            self._callbacks.remove(callback)
+        with self._lock:
+            callbacks = list(self._callbacks)
+            if callback in callbacks:
+                callbacks.remove(callback)
+                self._callbacks = tuple(callbacks)
     
-    def _notify_callbacks(self, level: str, message: str) -> None:
-        """Notify all callbacks of new log message."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        for callback in self._callbacks:
+    def add_batch_callback(self, callback) -> None:
+        """
+        Add a callback that receives log messages in batches.
+        
+        The callback is called from the drain thread with a list of
+        (timestamp, level, message) tuples holding everything logged since
+        the previous call, so a UI can update once per burst.
+        """
+        with self._lock:
+            self._batch_callbacks = self._batch_callbacks + (callback,)
+    
+    def remove_batch_callback(self, callback) -> None:
+        """Remove a batch log callback."""
+        with self._lock:
+            callbacks = list(self._batch_callbacks)
+            if callback in callbacks:
+                callbacks.remove(callback)
+                self._batch_callbacks = tuple(callbacks)
+    
+    def _post(self, levelno: int, level: str, message) -> None:
+        """
+        Queue a log record for the drain thread (safe from any thread).
+        
+        message is either the text or a tuple of _format_operation()
+        arguments, formatted on the drain thread. Nothing is queued when no
+        callback or logging handler would receive it.
+        """
+        if not (self._callbacks or self._batch_callbacks
+                or (self._logger.hasHandlers() and self._logger.isEnabledFor(levelno))):
+            return
+        self._queue.append((time.time(), levelno, level, message))
+        if not self._wake.is_set():
+            self._wake.set()
+    
+    def _drain(self) -> None:
+        """Deliver queued records in batches, forever (drain thread only)."""
+        queue = self._queue
+        wake = self._wake
+        while True:
+            wake.wait()
+            # Clear before draining so a record appended meanwhile re-arms the wake
+            wake.clear()
+            batch = []
+            while queue:
+                batch.append(queue.popleft())
+            self._deliver(batch)
+    
+    def _deliver(self, batch: list) -> None:
+        """Pass one drained batch to the logger and callbacks."""
+        callbacks = self._callbacks
+        batch_callbacks = self._batch_callbacks
+        # Without handlers a LogRecord would only be built to be thrown away;
+        # the logger is kept so code attaching a handler still receives records
+        logger = self._logger if self._logger.hasHandlers() else None
+        records = []
+        for created, levelno, level, message in batch:
+            if message.__class__ is tuple:
+                message = _format_operation(*message)
+            if logger is not None:
+                logger.log(levelno, message)
+            records.append((self._timestamp(created), level, message))
+        
+        for callback in batch_callbacks:
             try:
-                callback(timestamp, level, message)
+                callback(records)
             except Exception:
                 pass
+        for timestamp, level, message in records:
+            for callback in callbacks:
+                try:
+                    callback(timestamp, level, message)
+                except Exception:
+                    pass
+    
+    def _timestamp(self, created: float) -> str:
+        """Format created as "%H:%M:%S", reusing the string within a second."""
+        second = int(created)
+        cached_second, timestamp = self._ts_cache
+        if second != cached_second:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(created))
+            self._ts_cache = (second, timestamp)
+        return timestamp
     
     def debug(self, message: str) -> None:
         """Log debug message."""
-        self._logger.debug(message)
-        self._notify_callbacks("DEBUG", message)
+        self._post(logging.DEBUG, "DEBUG", message)
     
     def info(self, message: str) -> None:
         """Log info message."""
-        self._logger.info(message)
-        self._notify_callbacks("INFO", message)
+        self._post(logging.INFO, "INFO", message)
     
     def warning(self, message: str) -> None:
         """Log warning message."""
-        self._logger.warning(message)
-        self._notify_callbacks("WARNING", message)
+        self._post(logging.WARNING, "WARNING", message)
     
     def error(self, message: str) -> None:
         """Log error message."""
-        self._logger.error(message)
-        self._notify_callbacks("ERROR", message)
+        self._post(logging.ERROR, "ERROR", message)
     
     def operation(self, operation: str, target: str, details: str = "", status: str = "") -> None:
         """Log an operation with structured format."""
-        message = f"[{operation}] {target}"
-        if details:
-            message += f" - {details}"
-        if status:
-            message = f"{status}: {message}"
-        self.info(message)
+        self._post(logging.INFO, "INFO", (operation, target, details, status, ""))
         
     def operation_start(self, operation: str, target: str, details: str = "") -> None:
         """Log the start of a long-running operation."""
-        self.operation(operation, target, details, status=_("status_start"))
+        self._post(logging.INFO, "INFO", (operation, target, details, "", "status_start"))
         
     def operation_end(self, operation: str, target: str, details: str = "", success: bool = True) -> None:
         """Log the end of a long-running operation."""
-        status = _("status_finish") if success else _("status_failed")
-        self.operation(operation, target, details, status=status)
+        status_key = "status_finish" if success else "status_failed"
+        self._post(logging.INFO, "INFO", (operation, target, details, "", status_key))
+
+
+# Created at import (which Python serializes), so get_logger() never locks
+_LOGGER = VaultLogger()
 
 
 def get_logger() -> VaultLogger:
     """Get the global logger instance."""
-    return VaultLogger()
+    return _LOGGER